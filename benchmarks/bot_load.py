@@ -0,0 +1,174 @@
+# --------------------------------------------------------------------
+# Program: Bot Load Tester
+# Author: Alex Hyde
+# Date: Dec 02 2019
+# Description: Plays puzzles end to end with simulated players on a
+#   pool of worker processes, through the same WordSearch methods the
+#   game uses when a drag is released (get_b_list, check_word and the
+#   highlight). Players drag from each word's first letter to its last,
+#   with missed drags mixed in, until the puzzle is complete. Reports
+#   games per second, the latency of each selection and the memory
+#   used by a game (resident memory, which includes the pygame
+#   surfaces). Runs are repeatable for the same seed.
+# Input: python -m benchmarks.bot_load puzzles.txt [--games N]
+#   [--workers N] [--miss PERCENT] [--seed N] [--json PATH]
+#   (run from the repository folder)
+# --------------------------------------------------------------------
+
+import gc
+import json
+import os
+import random
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor
+
+MEMORY_SAMPLES = 20  # games per worker kept alive at once to measure the memory of a game
+MAX_MISSES = 10  # most missed drags before finding a word
+
+
+# return the word search view class (imported in the worker, after selecting the dummy video driver)
+def get_word_search():
+    os.environ.setdefault("SDL_VIDEODRIVER", "dummy")
+    os.environ.setdefault("SDL_AUDIODRIVER", "dummy")
+    import main_wordsearch
+
+    return main_wordsearch.WordSearch
+
+
+# return the resident memory of the process in bytes (the peak on systems without /proc)
+def get_rss():
+    try:
+        with open("/proc/self/statm", "r") as f:
+            return int(f.read().split()[1]) * os.sysconf("SC_PAGE_SIZE")
+    except (OSError, ValueError, IndexError):
+        import resource
+
+        rss = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+        return rss if sys.platform == "darwin" else rss * 1024  # bytes on macOS, kilobytes elsewhere
+
+
+# return list of drags (first cell position, last cell position) a player makes to finish a puzzle
+def plan_drags(p, placements, miss, rng):
+    drags = []
+    for word in p.words:
+        placement = placements[word]
+        if placement is None:
+            continue
+        misses = 0
+        while misses < MAX_MISSES and rng.random() < miss:  # missed drags before finding the word
+            drags.append(((rng.randrange(p.c), rng.randrange(p.r)), (rng.randrange(p.c), rng.randrange(p.r))))
+            misses += 1
+        drags.append((placement.start, placement.end))
+    rng.shuffle(drags)
+    return drags
+
+
+# play one game, returns the word search and the time (in seconds) of each selection
+def play(word_search_class, p, drags):
+    ws = word_search_class((100, 100, 500, 500), p, gap=2)
+    latencies = []
+    for first, last in drags:
+        start = time.perf_counter()
+        # the drag and its release, as the main loop does them
+        ws.first_click = first
+        ws.second_click = last
+        ws.set_highlight(ws.get_b_list())
+        ws.check_word(ws.get_b_list())
+        ws.unhighlight_buttons()
+        ws.first_click = None
+        ws.second_click = None
+        latencies.append(time.perf_counter() - start)
+    return ws, latencies
+
+
+# play games of a worker's share, returns (games, selection latencies, bytes used per game, seconds)
+def run_worker(job):
+    path, games, miss, seed = job
+    import library
+    import solver
+
+    word_search_class = get_word_search()
+    rng = random.Random(seed)
+    solved = {}  # puzzle index -> placements of its words (solving isn't part of what is measured)
+    with library.open_library(path) as puzzles:
+        plans = []
+        for g in range(games):
+            ind = rng.randrange(len(puzzles))
+            p = puzzles[ind]
+            if ind not in solved:
+                solved[ind] = solver.solve(p)
+            plans.append((p, plan_drags(p, solved[ind], miss, rng)))
+
+    # the games played first are kept alive together (surfaces are allocated by SDL, so resident memory is measured)
+    # the first game is played before measuring so the fonts and glyph atlases aren't counted
+    samples = plans[:MEMORY_SAMPLES]
+    play(word_search_class, *samples[0])
+    gc.collect()
+    before = get_rss()
+    games_alive = [play(word_search_class, p, drags)[0] for p, drags in samples]
+    memory = [(get_rss() - before) / len(samples)]
+    del games_alive
+    gc.collect()
+
+    latencies = []
+    start = time.perf_counter()
+    for p, drags in plans:
+        ws, game_latencies = play(word_search_class, p, drags)
+        if not ws.game.is_complete():
+            raise RuntimeError("game of " + p.get_title() + " was not completed")
+        latencies += game_latencies
+    return games, latencies, memory, time.perf_counter() - start
+
+
+# return the value at a percentile of a sorted list
+def percentile(values, p):
+    return values[min(int(len(values) * p / 100), len(values) - 1)]
+
+
+# run the games on a pool of workers, returns a dictionary of results
+def run(path, games, workers=None, miss=0.3, seed=0):
+    workers = workers or os.cpu_count() or 1
+    shares = [games // workers + (1 if i < games % workers else 0) for i in range(workers)]
+    jobs = [(path, share, miss, seed * 1000 + i) for i, share in enumerate(shares) if share > 0]
+    start = time.perf_counter()
+    with ProcessPoolExecutor(len(jobs)) as pool:
+        results = list(pool.map(run_worker, jobs))
+    wall = time.perf_counter() - start
+
+    latencies = sorted(t for r in results for t in r[1])
+    memory = [m for r in results for m in r[2]]
+    busy = max(r[3] for r in results)  # time spent playing by the slowest worker (without start up)
+    return {"games": games, "workers": len(jobs), "selections": len(latencies), "wall_time": wall,
+            "games_per_second": games / busy, "selections_per_second": len(latencies) / busy,
+            "latency_us": {str(p): percentile(latencies, p) * 1e6 for p in (50, 95, 99, 100)},
+            "memory_per_game": sum(memory) / len(memory)}
+
+
+if __name__ == "__main__":
+    args = sys.argv[1:]
+    options = {"--games": "2000", "--workers": None, "--miss": "30", "--seed": "0", "--json": None}
+    paths = []
+    i = 0
+    while i < len(args):
+        if args[i] in options and i + 1 < len(args):
+            options[args[i]] = args[i + 1]
+            i += 1
+        else:
+            paths.append(args[i])
+        i += 1
+    if len(paths) != 1 or not 0 <= int(options["--miss"]) <= 100:
+        print("usage: python -m benchmarks.bot_load puzzles.txt [--games N] [--workers N] [--miss PERCENT] "
+              "[--seed N] [--json PATH]")
+        sys.exit(2)
+
+    stats = run(paths[0], int(options["--games"]), options["--workers"] and int(options["--workers"]),
+                int(options["--miss"]) / 100, int(options["--seed"]))
+    print("%d games on %d workers, %d selections" % (stats["games"], stats["workers"], stats["selections"]))
+    print("%.1f games/s, %.0f selections/s" % (stats["games_per_second"], stats["selections_per_second"]))
+    print("selection latency us  p50 %.1f  p95 %.1f  p99 %.1f  max %.1f"
+          % tuple(stats["latency_us"][str(p)] for p in (50, 95, 99, 100)))
+    print("memory per game %.1f KiB" % (stats["memory_per_game"] / 1024))
+    if options["--json"] is not None:
+        with open(options["--json"], "w") as f:
+            json.dump(stats, f, indent=2)
@@ -0,0 +1,195 @@
+# --------------------------------------------------------------------
+# Program: Rendering Benchmark
+# Author: Alex Hyde
+# Date: Dec 03 2019
+# Description: Times the UI code under the SDL dummy video driver (no
+#   window is shown): word search construction at several board sizes,
+#   drawing the puzzle select and game frames, button processing,
+#   highlighting during a scripted drag and reading synthetic puzzle
+#   libraries. Results can be saved as JSON and compared against a
+#   saved baseline, slower results than the baseline allows are
+#   reported and make the run exit with status 1.
+# Input: python -m benchmarks.render_bench [--repeat N] [--json PATH]
+#   [--baseline PATH] [--threshold PERCENT] (run from the repository
+#   folder)
+# --------------------------------------------------------------------
+
+import json
+import os
+import sys
+import tempfile
+import time
+
+# the dummy driver has to be selected before pygame is imported
+os.environ.setdefault("SDL_VIDEODRIVER", "dummy")
+os.environ.setdefault("SDL_AUDIODRIVER", "dummy")
+
+import pygame
+
+import frame
+import generator
+import grid
+import library
+import main_wordsearch
+import puzzle
+from benchmarks.solver_bench import random_puzzle
+
+BOARD_SIZES = (10, 50, 200)
+LIBRARY_SIZES = (100, 1000)
+RECT = (100, 100, 500, 500)  # where the game puts the word search
+DRAG_STEPS = 200  # mouse positions in a scripted drag or mouse path
+LIBRARY_WORDS = ["SUMMER", "HOLIDAYS", "TEACHER", "FRIENDS", "LEARN", "SCHOOL", "SEPTEMBER", "PENCIL", "RULER",
+                 "ERASER", "BINDER", "RECESS"]
+
+
+# return the time of every run of a function
+def time_runs(func, repeat):
+    times = []
+    for i in range(repeat):
+        start = time.perf_counter()
+        func()
+        times.append(time.perf_counter() - start)
+    return times
+
+
+# return a word search for a size x size board (the gap is dropped on big boards, there isn't room for it)
+def make_word_search(p):
+    return main_wordsearch.WordSearch(RECT, p, gap=2 if p.c <= 20 else 0, hColor=main_wordsearch.ORANGE)
+
+
+# return list of mouse positions moving evenly from one point to another
+def mouse_path(start, end, steps=DRAG_STEPS):
+    return [(int(start[0] + (end[0] - start[0]) * i / (steps - 1)),
+             int(start[1] + (end[1] - start[1]) * i / (steps - 1))) for i in range(steps)]
+
+
+# return function dragging from the top left cell of a word search to the bottom right and back up to the top right
+def scripted_drag(ws):
+    x, y = ws.get_cell_coords(0)
+    start = (int(x + ws.cWidth / 2), int(y + ws.cHeight / 2))
+    corner = (int(ws.x + ws.w - ws.cWidth / 2), int(ws.y + ws.h - ws.cHeight / 2))
+    path = mouse_path(start, corner) + mouse_path(corner, (corner[0], start[1]))
+
+    def drag():
+        ws.first_click = (0, 0)
+        ws.start_pos = start
+        for pos in path:
+            ws.highlight_buttons(pos)
+        ws.unhighlight_buttons()
+        ws.first_click = None
+        ws.second_click = None
+    return drag
+
+
+# return function processing a list of buttons with the mouse moving along a path
+def move_over(button_list, path):
+    def move():
+        for pos in path:
+            button_list.process_events(False, False, pos)
+    return move
+
+
+# write a synthetic puzzle library of 15 x 15 puzzles, returns its path
+def write_library(folder, count):
+    path = os.path.join(folder, "library" + str(count) + ".txt")
+    with open(path, "w") as f:
+        puzzle.write_puzzles([generator.generate_puzzle("Puzzle " + str(i), LIBRARY_WORDS, 15, 15, i)
+                                 for i in range(count)], f)
+    return path
+
+
+# return function reading every puzzle of a file
+def read_all(path):
+    def read():
+        with open(path, "r") as f:
+            puzzle.read_in_puzzles(f)
+    return read
+
+
+# run every benchmark, returns dictionary of benchmark name -> list of run times (in seconds)
+def run(repeat):
+    pygame.init()
+    win = pygame.display.set_mode((main_wordsearch.WIN_WIDTH, main_wordsearch.WIN_HEIGHT))
+    results = {}
+
+    def bench(name, func, runs=repeat):
+        results[name] = time_runs(func, runs)
+        print("%-36s %10.3f ms" % (name, min(results[name]) * 1000))
+
+    with tempfile.TemporaryDirectory() as folder:
+        library_paths = {count: write_library(folder, count) for count in LIBRARY_SIZES}
+
+        for size in BOARD_SIZES:
+            p = random_puzzle(size, min(size, 40))
+            # the first word search also builds the glyph atlas, which is shared by later ones
+            bench("construct %dx%d" % (size, size), lambda: make_word_search(p))
+            ws = make_word_search(p)
+            game_frame = frame.Frame([ws], [ws], main_wordsearch.THE_BLUE)
+            bench("draw game frame %dx%d" % (size, size), lambda: game_frame.draw(win))
+            bench("highlight drag %dx%d" % (size, size), scripted_drag(ws))
+            bench("board process_events %dx%d" % (size, size),
+                  move_over(ws, mouse_path((ws.x, ws.y), (ws.x + ws.w, ws.y + ws.h))))
+
+        with library.open_library(library_paths[LIBRARY_SIZES[-1]]) as puzzles:
+            puzzle_select, select_frame = main_wordsearch.create_puzzle_select(puzzles)
+            bench("draw puzzle select frame", lambda: select_frame.draw(win))
+            bench("scroll puzzle select", lambda: puzzle_select.scroll(1))
+            path = mouse_path((puzzle_select.x, puzzle_select.y),
+                              (puzzle_select.x + puzzle_select.w, puzzle_select.y + puzzle_select.h))
+            bench("select process_events", move_over(puzzle_select.button_list, path))
+
+        menu = grid.Menu(RECT, 20, 20, [str(i) for i in range(400)], gap=2)
+        bench("menu 20x20 process_events", move_over(menu.button_list, mouse_path((100, 100), (600, 600))))
+
+        for count, path in library_paths.items():
+            bench("read_in_puzzles %d" % count, read_all(path))
+    pygame.quit()
+    return results
+
+
+# return dictionary of benchmark name -> summary (best and mean time)
+def summarize(results):
+    return {name: {"best": min(times), "mean": sum(times) / len(times), "runs": len(times)}
+            for name, times in results.items()}
+
+
+# print each benchmark's time against the baseline's, returns list of benchmarks slower than the threshold allows
+def compare(summary, baseline, threshold):
+    regressions = []
+    print("\n%-36s %10s %10s %8s" % ("benchmark", "base (ms)", "now (ms)", "change"))
+    for name, stats in summary.items():
+        if name not in baseline:
+            print("%-36s %10s %10.3f %8s" % (name, "-", stats["best"] * 1000, "new"))
+            continue
+        base = baseline[name]["best"]
+        change = stats["best"] / base - 1 if base > 0 else 0.0
+        flag = ""
+        if change > threshold:
+            regressions.append(name)
+            flag = "  REGRESSION"
+        print("%-36s %10.3f %10.3f %+7.1f%%%s" % (name, base * 1000, stats["best"] * 1000, change * 100, flag))
+    return regressions
+
+
+if __name__ == "__main__":
+    args = sys.argv[1:]
+    options = {"--repeat": "5", "--json": None, "--baseline": None, "--threshold": "20"}
+    i = 0
+    while i < len(args):
+        if args[i] in options and i + 1 < len(args):
+            options[args[i]] = args[i + 1]
+            i += 2
+        else:
+            print("usage: python -m benchmarks.render_bench [--repeat N] [--json PATH] [--baseline PATH] "
+                  "[--threshold PERCENT]")
+            sys.exit(2)
+
+    summary = summarize(run(int(options["--repeat"])))
+    if options["--json"] is not None:
+        with open(options["--json"], "w") as f:
+            json.dump({"driver": os.environ["SDL_VIDEODRIVER"], "results": summary}, f, indent=2)
+    if options["--baseline"] is not None:
+        with open(options["--baseline"], "r") as f:
+            baseline_results = json.load(f)["results"]
+        if compare(summary, baseline_results, int(options["--threshold"]) / 100):
+            sys.exit(1)
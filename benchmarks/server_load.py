@@ -0,0 +1,133 @@
+# --------------------------------------------------------------------
+# Program: Server Load Generator
+# Author: Alex Hyde
+# Date: Dec 01 2019
+# Description: Plays games against the word search server from many
+#   concurrent clients and reports request throughput and latency.
+#   Each client starts random puzzles and selects every word (with
+#   some missed selections mixed in), using the solver to find where
+#   the words are. Without an address an in process server is started
+#   on a free port.
+# Input: python -m benchmarks.server_load puzzles.txt [--clients N]
+#   [--games N] [--host HOST] [--port PORT] [--unix PATH] [--seed N]
+#   (run from the repository folder)
+# --------------------------------------------------------------------
+
+import asyncio
+import json
+import random
+import sys
+import time
+
+import library
+import server
+import solver
+
+
+# one client connection, sending a request and waiting for its reply
+class Client:
+    def __init__(self, reader, writer):
+        self.reader = reader
+        self.writer = writer
+        self.latencies = []  # seconds per request
+
+    # send a request and return its reply
+    async def request(self, **request):
+        start = time.perf_counter()
+        self.writer.write((json.dumps(request) + "\n").encode("utf-8"))
+        line = await self.reader.readline()
+        self.latencies.append(time.perf_counter() - start)
+        reply = json.loads(line)
+        if not reply["ok"]:
+            raise RuntimeError("request " + str(request) + " failed: " + reply["error"])
+        return reply
+
+    async def close(self):
+        self.writer.close()
+        await self.writer.wait_closed()
+
+
+# return (placements of every word, so a game can be played) of a puzzle index, solved once per puzzle
+def get_answers(puzzles, answers, ind):
+    if ind not in answers:
+        answers[ind] = solver.solve(puzzles[ind])
+    return answers[ind]
+
+
+# play games on one connection, returns the client (with its request latencies)
+async def run_client(connect, puzzles, answers, games, seed):
+    rng = random.Random(seed)
+    reader, writer = await connect()
+    client = Client(reader, writer)
+    for g in range(games):
+        ind = rng.randrange(len(puzzles))
+        reply = await client.request(op="start", puzzle=ind)
+        session = reply["session"]
+        rows, cols = reply["rows"], reply["cols"]
+        for word, p in get_answers(puzzles, answers, ind).items():
+            if p is None:
+                continue
+            # a missed drag first, like a player would make
+            await client.request(op="select", session=session, start=[rng.randrange(cols), rng.randrange(rows)],
+                                 end=[rng.randrange(cols), rng.randrange(rows)])
+            await client.request(op="select", session=session, start=list(p.start), end=list(p.end))
+        reply = await client.request(op="state", session=session)
+        if not reply["complete"]:
+            raise RuntimeError("game of puzzle " + str(ind) + " was not completed")
+        await client.request(op="end", session=session)
+    await client.close()
+    return client
+
+
+# return the value at a percentile of a sorted list
+def percentile(values, p):
+    return values[min(int(len(values) * p / 100), len(values) - 1)]
+
+
+# run the load test and print the results
+async def run(path, clients, games, host=None, port=None, unix_path=None, seed=0):
+    with library.open_library(path) as puzzles:
+        game_server = None
+        if host is None and unix_path is None:
+            game_server = server.GameServer(puzzles)
+            await game_server.start(server.DEFAULT_HOST, 0)
+            host, port = game_server.get_address()[:2]
+        if unix_path is not None:
+            connect = lambda: asyncio.open_unix_connection(unix_path)
+        else:
+            connect = lambda: asyncio.open_connection(host, port)
+
+        answers = {}
+        start = time.perf_counter()
+        results = await asyncio.gather(*[run_client(connect, puzzles, answers, games, seed + i)
+                                         for i in range(clients)])
+        total = time.perf_counter() - start
+        if game_server is not None:
+            await game_server.close()
+
+    latencies = sorted(t for c in results for t in c.latencies)
+    print("clients %d, games %d, requests %d in %.2f s" % (clients, clients * games, len(latencies), total))
+    print("throughput %.0f requests/s, %.1f games/s" % (len(latencies) / total, clients * games / total))
+    print("latency ms  p50 %.3f  p95 %.3f  p99 %.3f  max %.3f"
+          % tuple(percentile(latencies, p) * 1000 for p in (50, 95, 99, 100)))
+
+
+if __name__ == "__main__":
+    args = sys.argv[1:]
+    options = {"--clients": "50", "--games": "20", "--host": None, "--port": str(server.DEFAULT_PORT),
+               "--unix": None, "--seed": "0"}
+    paths = []
+    i = 0
+    while i < len(args):
+        if args[i] in options and i + 1 < len(args):
+            options[args[i]] = args[i + 1]
+            i += 1
+        else:
+            paths.append(args[i])
+        i += 1
+    if len(paths) != 1:
+        print("usage: python -m benchmarks.server_load puzzles.txt [--clients N] [--games N] [--host HOST] "
+              "[--port PORT] [--unix PATH] [--seed N]")
+        sys.exit(2)
+    asyncio.run(run(paths[0], int(options["--clients"]), int(options["--games"]), options["--host"],
+                    int(options["--port"]), options["--unix"], int(options["--seed"])))
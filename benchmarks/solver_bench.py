@@ -0,0 +1,90 @@
+# --------------------------------------------------------------------
+# Program: Solver Benchmark
+# Author: Alex Hyde
+# Date: Nov 21 2019
+# Description: Times the pure Python and NumPy solver backends on
+#   random boards with planted words and checks that both backends
+#   find the same placements.
+# Input: python -m benchmarks.solver_bench [size ...] [--words N]
+#   [--repeat N] (run from the repository folder)
+# --------------------------------------------------------------------
+
+import random
+import string
+import sys
+import time
+
+import puzzle
+import solver
+
+
+# return a random size x size puzzle with a number of random words planted in it
+def random_puzzle(size, word_count, seed=0):
+    rng = random.Random(seed)
+    letters = [rng.choice(string.ascii_uppercase) for _ in range(size * size)]
+    words = []
+    for i in range(word_count):
+        length = rng.randint(4, min(12, size))
+        word = "".join(rng.choice(string.ascii_uppercase) for _ in range(length))
+        dx, dy = rng.choice(solver.DIRECTIONS)
+        # pick a start cell that keeps the whole word on the board
+        xs = range(length - 1, size) if dx < 0 else range(size - (length - 1) * dx)
+        ys = range(length - 1, size) if dy < 0 else range(size - (length - 1) * dy)
+        x, y = rng.choice(xs), rng.choice(ys)
+        for j, ch in enumerate(word):
+            letters[(y + dy * j) * size + x + dx * j] = ch
+        words.append(word)
+    # later words may overwrite letters of earlier ones, so keep only the words that are still on the board
+    p = puzzle.Puzzle("Benchmark " + str(size), letters, words, size, size)
+    p.words = [w for w, found in solver.find_words(p).items() if found]
+    return p
+
+
+# return the best time (in seconds) of running a function a number of times, and its last result
+def best_time(func, repeat):
+    best = None
+    result = None
+    for i in range(repeat):
+        start = time.perf_counter()
+        result = func()
+        t = time.perf_counter() - start
+        if best is None or t < best:
+            best = t
+    return best, result
+
+
+# return set of (word, start, end) for comparing solver results
+def placements(found):
+    return {(p.word, p.start, p.end) for ps in found.values() for p in ps}
+
+
+def main(args):
+    sizes = []
+    word_count = 200
+    repeat = 3
+    i = 0
+    while i < len(args):
+        if args[i] == "--words":
+            word_count = int(args[i + 1])
+            i += 1
+        elif args[i] == "--repeat":
+            repeat = int(args[i + 1])
+            i += 1
+        else:
+            sizes.append(int(args[i]))
+        i += 1
+    if not sizes:
+        sizes = [15, 50, 200, 400]
+
+    print("%6s %6s %12s %12s %8s" % ("size", "words", "python (s)", "numpy (s)", "speedup"))
+    for size in sizes:
+        p = random_puzzle(size, word_count if size >= 50 else size)
+        py_time, py_found = best_time(lambda: solver.find_words(p, backend=solver.PYTHON), repeat)
+        np_time, np_found = best_time(lambda: solver.find_words(p, backend=solver.NUMPY), repeat)
+        if placements(py_found) != placements(np_found):
+            raise Exception("Solver backends disagree on the " + str(size) + "x" + str(size) + " board")
+        print("%6d %6d %12.4f %12.4f %7.1fx" % (size, len(p.words), py_time, np_time, py_time / np_time))
+
+
+if __name__ == "__main__":
+    main(sys.argv[1:])
@@ -0,0 +1,238 @@
+# --------------------------------------------------------------------
+# Program: Binary Puzzle Format
+# Author: Alex Hyde
+# Date: Nov 24 2019
+# Description: Compact binary container for puzzle libraries, with a
+#   converter to and from the puzzle text format. A single puzzle is
+#   read by seeking straight to its record through the offset table.
+#
+#   Layout (little endian):
+#     header        magic "WSPZ", version (u16), flags (u16),
+#                   puzzle count (u32), word count (u32), offset table
+#                   offset (u64), title table offset (u64), word table
+#                   offset (u64)
+#     records       rows (u16), columns (u16), one byte per cell,
+#                   word count (u16), word table index per word (u32)
+#     title table   per puzzle: length (u16), utf-8 title
+#     word table    per distinct word: length (u16), utf-8 word
+#     offset table  per puzzle: record offset (u64), record length
+#                   (u32), record flags (u32, bit 0 = zlib compressed)
+#   The tables are written after the records so puzzles can be
+#   streamed into the file without knowing how many there are.
+# Input: python binformat.py to-binary puzzles.txt puzzles.wsp
+#   [--compress] or python binformat.py to-text puzzles.wsp out.txt
+# --------------------------------------------------------------------
+
+import gc
+import struct
+import sys
+import zlib
+
+import library
+import puzzle
+
+MAGIC = b"WSPZ"
+VERSION = 1
+HEADER = struct.Struct("<4sHHIIQQQ")
+OFFSET = struct.Struct("<QII")
+SIZE = struct.Struct("<HH")  # rows, columns
+COUNT = struct.Struct("<H")  # word count, string length
+INDEX = struct.Struct("<I")  # word table index
+
+COMPRESSED = 1  # record flag
+
+
+# return if a file starts with the binary format's magic bytes
+def is_binary_file(path):
+    with open(path, "rb") as f:
+        return f.read(len(MAGIC)) == MAGIC
+
+
+# return a string encoded with its length in front
+def pack_string(s):
+    data = s.encode("utf-8")
+    return COUNT.pack(len(data)) + data
+
+
+# return list of length prefixed strings read from a block of bytes
+def unpack_strings(data, count):
+    strings = []
+    pos = 0
+    for i in range(count):
+        length = COUNT.unpack_from(data, pos)[0]
+        pos += COUNT.size
+        strings.append(data[pos:pos + length].decode("utf-8"))
+        pos += length
+    return strings
+
+
+# return the bytes of a puzzle record, adding new words to the word table (word -> index)
+def pack_record(p, words):
+    letters = "".join(p.letters)
+    if len(letters) != p.r * p.c:
+        raise ValueError("Every cell of puzzle '" + p.get_title() + "' must be a single letter")
+    parts = [SIZE.pack(p.r, p.c), letters.encode("latin-1"), COUNT.pack(len(p.words))]
+    for w in p.words:
+        if w not in words:
+            words[w] = len(words)
+        parts.append(INDEX.pack(words[w]))
+    return b"".join(parts)
+
+
+# return a puzzle from its record bytes
+def unpack_record(data, title, word_table):
+    r, c = SIZE.unpack_from(data, 0)
+    pos = SIZE.size
+    letters = list(data[pos:pos + r * c].decode("latin-1"))
+    pos += r * c
+    count = COUNT.unpack_from(data, pos)[0]
+    pos += COUNT.size
+    words = [word_table[i] for i in struct.unpack_from("<" + str(count) + "I", data, pos)]
+    return puzzle.Puzzle(title, letters, words, c, r)
+
+
+# write puzzles (any iterable, e.g. a generator streaming from a text file) to a binary file
+# returns the number of puzzles written
+def write_binary(puzzles, path, compress=False):
+    offsets = []
+    titles = []
+    words = {}  # word -> index in the word table
+    with open(path, "wb") as f:
+        f.write(HEADER.pack(MAGIC, VERSION, 0, 0, 0, 0, 0, 0))  # rewritten once the tables are written
+        pos = HEADER.size
+        for p in puzzles:
+            record = pack_record(p, words)
+            flags = 0
+            if compress:
+                packed = zlib.compress(record)
+                if len(packed) < len(record):
+                    record = packed
+                    flags = COMPRESSED
+            f.write(record)
+            offsets.append(OFFSET.pack(pos, len(record), flags))
+            titles.append(p.get_title())
+            pos += len(record)
+
+        title_offset = pos
+        for t in titles:
+            data = pack_string(t)
+            f.write(data)
+            pos += len(data)
+        word_offset = pos
+        for w in words:  # dictionaries keep insertion order, which is the word index order
+            data = pack_string(w)
+            f.write(data)
+            pos += len(data)
+        f.write(b"".join(offsets))
+
+        f.seek(0)
+        f.write(HEADER.pack(MAGIC, VERSION, 0, len(titles), len(words), pos, title_offset, word_offset))
+    return len(titles)
+
+
+# library of puzzles in a binary file, with the same methods as library.PuzzleLibrary
+class BinaryLibrary:
+    def __init__(self, path):
+        self.path = path
+        self.file = open(path, "rb")
+        magic, version, flags, count, word_count, offset_table, title_offset, word_offset = HEADER.unpack(
+            self.file.read(HEADER.size))
+        if magic != MAGIC:
+            raise ValueError(path + " is not a binary puzzle file")
+        if version != VERSION:
+            raise ValueError(path + " has unsupported binary puzzle version " + str(version))
+        self.count = count
+        self.file.seek(offset_table)
+        self.offsets = list(OFFSET.iter_unpack(self.file.read(OFFSET.size * count)))
+        self.file.seek(title_offset)
+        self.title_list = unpack_strings(self.file.read(word_offset - title_offset), count)
+        self.word_count = word_count
+        self.word_offset = word_offset
+        self.offset_table = offset_table
+        self.word_table = None  # read the first time a puzzle is
+
+    # return list of every puzzle's words, read once and shared by every puzzle
+    def words(self):
+        if self.word_table is None:
+            self.file.seek(self.word_offset)
+            self.word_table = unpack_strings(self.file.read(self.offset_table - self.word_offset), self.word_count)
+        return self.word_table
+
+    def titles(self):
+        return list(self.title_list)
+
+    def get_title(self, ind):
+        return self.title_list[ind]
+
+    # return a puzzle, read by seeking to its record
+    def get(self, ind):
+        offset, length, flags = self.offsets[ind]
+        word_table = self.words()
+        self.file.seek(offset)
+        data = self.file.read(length)
+        if flags & COMPRESSED:
+            data = zlib.decompress(data)
+        return unpack_record(data, self.title_list[ind], word_table)
+
+    def close(self):
+        self.file.close()
+
+    def __getitem__(self, ind):
+        return self.get(ind)
+
+    def __len__(self):
+        return self.count
+
+    def __iter__(self):
+        for i in range(self.count):
+            yield self.get(i)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *args):
+        self.close()
+
+
+# return list of every puzzle in a binary file (the same puzzle objects puzzle.read_in_puzzles returns)
+def load(path):
+    # the garbage collector is paused while loading, otherwise it keeps rescanning every letter list loaded so far
+    # (none of the new objects can be part of a reference cycle)
+    was_enabled = gc.isenabled()
+    gc.disable()
+    try:
+        with BinaryLibrary(path) as lib:
+            return list(lib)
+    finally:
+        if was_enabled:
+            gc.enable()
+
+
+# convert a puzzle text file to a binary file, returns the number of puzzles
+def text_to_binary(text_path, binary_path, compress=False):
+    with open(text_path, "r") as f:
+        return write_binary(library.iter_puzzles(f), binary_path, compress)
+
+
+# convert a binary file to a puzzle text file, returns the number of puzzles
+def binary_to_text(binary_path, text_path):
+    with BinaryLibrary(binary_path) as lib, open(text_path, "w") as f:
+        f.write(str(len(lib)) + "\n")
+        for p in lib:
+            f.write(puzzle.format_puzzle(p))
+        return len(lib)
+
+
+if __name__ == "__main__":
+    args = sys.argv[1:]
+    compress_records = "--compress" in args
+    args = [a for a in args if a != "--compress"]
+    if len(args) == 3 and args[0] == "to-binary":
+        n = text_to_binary(args[1], args[2], compress_records)
+    elif len(args) == 3 and args[0] == "to-text":
+        n = binary_to_text(args[1], args[2])
+    else:
+        print("usage: python binformat.py to-binary puzzles.txt puzzles.wsp [--compress]\n"
+              "       python binformat.py to-text puzzles.wsp puzzles.txt")
+        sys.exit(2)
+    print("Converted " + str(n) + " puzzles")
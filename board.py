@@ -0,0 +1,292 @@
+# --------------------------------------------------------------------
+# Program: Board Class
+# Author: Alex Hyde
+# Date: Nov 26 2019
+# Description: Grid of clickable letter cells drawn onto one cached
+#   surface. Cell state (letter, fill colour, colour shown) is kept in
+#   flat lists instead of a button and label per cell, letters are
+#   blitted from the shared glyph atlas, and only the cells
+#   that changed are repainted. Used in place of a grid.Menu for large
+#   letter grids.
+# Input: Processes clicks, releases and hovers like a button list,
+#   with cells given by their index.
+# --------------------------------------------------------------------
+
+import pygame
+import grid
+import dirty
+import glyphs
+import profiler
+
+# colours
+WHITE = (255, 255, 255)
+BLACK = (0, 0, 0)
+
+# tan(22.5 degrees) as a fraction, a drag snaps to the nearest of the 8 directions (45 degree bands)
+SNAP_NUM = 70
+SNAP_DEN = 169
+
+
+# concrete board sub class of Grid
+class Board(grid.Grid):
+    def __init__(self, rect, r, c, letters, gap=0, cell_on_click=None, color=BLACK, visible_lines=True, active=True,
+                 visible=True, fColor=WHITE, bColor=BLACK, onHoldColor=(100, 100, 100),
+                 onHoverColor=(200, 200, 200), tColor=BLACK, border=1, font="lucida bright", text_size=18):
+        super().__init__(rect, r, c, gap, visible_lines, color)
+        self.letters = letters
+        self.visible = visible
+        self.active = active
+        # cell colours (shared by every cell except the fill colour)
+        self.bColor = bColor
+        self.onHoldColor = onHoldColor
+        self.onHoverColor = onHoverColor
+        self.tColor = tColor
+        self.b = border
+        self.font = font
+        self.text_size = text_size
+        self.fill = [fColor] * len(self)  # fill colour of each cell
+        self.shown_colors = [fColor] * len(self)  # colour each cell is showing (fill, hover or hold colour)
+        self.clicked_cells = set()  # cells being held down
+
+        # called with the cell index when a cell is clicked
+        self.on_click = cell_on_click if cell_on_click is not None else self.blank_func
+        self.on_release = self.blank_func
+        self.clicked = []
+        self.released = []
+        self.hovered = []
+        self.touched = []  # cells that may not be showing their fill colour
+
+        self.atlas = None  # glyph atlas the letters are drawn from
+        self.surface = None  # cached drawing of the whole board
+        self.changed = set()  # cells to repaint on the cached surface before it is drawn
+        self.render_surface()
+
+    # empty function (to be replaced by custom functions)
+    def blank_func(self, blank):
+        pass
+
+    # return the glyph atlas for the board's letters (a new one if the atlases were invalidated)
+    def get_atlas(self):
+        if self.atlas is None or self.atlas.generation != glyphs.get_generation():
+            self.atlas = glyphs.get_atlas(self.font, self.text_size, self.tColor)
+        return self.atlas
+
+    # paint every cell onto a new cached surface
+    def render_surface(self):
+        self.surface = pygame.Surface((int(self.w) + 1, int(self.h) + 1), pygame.SRCALPHA)
+        self.changed = set()
+        self.paint_cells(range(len(self)))
+
+    # paint cells onto the cached surface (same drawing as a button.Button)
+    def paint_cells(self, cells):
+        surf = self.surface
+        fill = surf.fill
+        w, h, b = self.cWidth, self.cHeight, self.b
+        gap, c = self.gap, self.c
+        ox, oy = int(self.x), int(self.y)
+        bColor = self.bColor
+        shown_colors = self.shown_colors
+        letters = self.letters
+        atlas = self.get_atlas()
+        blits = []
+        for ind in cells:
+            col = ind % c
+            row = ind // c
+            # coordinates relative to the board, worked out like the grid's points
+            x = gap * (col + 1) + w * col
+            y = gap * (row + 1) + h * row
+            # fill is used instead of draw.rect, it covers the same pixels and is faster
+            if shown_colors[ind] is not None:
+                fill(shown_colors[ind], (x, y, w, h))
+            if bColor is not None:
+                fill(bColor, (x, y, w, b))
+                fill(bColor, (x, y + b, b, h - b))
+                fill(bColor, (x + b, y + h - b, w - b, b))
+                fill(bColor, (x + w - b, y + b, b, h - b))
+            area = atlas.get_rect(letters[ind])
+            # position is worked out from the absolute coordinates so the text lands on the same pixel as a button's
+            blits.append((atlas.surface, (int(self.x + x + (w - area.w) * 0.5) - ox,
+                                          int(self.y + y + (h - area.h) * 0.5) - oy), area))
+        surf.blits(blits, False)
+
+    # mark a cell to be repainted
+    def cell_changed(self, ind):
+        self.changed.add(ind)
+        if self.visible:
+            x, y = self.get_cell_coords(ind)
+            dirty.mark((x, y, self.cWidth, self.cHeight))
+
+    def draw(self, win):
+        if self.visible_lines:
+            pygame.draw.rect(win, self.color, self.rect, 1)
+        if self.visible:
+            if self.atlas is not None and self.atlas.generation != glyphs.get_generation():
+                self.render_surface()  # theme changed, every letter has to be redrawn
+            if self.changed:
+                self.paint_cells(self.changed)
+                self.changed.clear()
+            win.blit(self.surface, (int(self.x), int(self.y)))
+
+    # return cell index at a set of coordinates, -1 if there is no cell at those coordinates
+    def get_cell_at(self, pos):
+        px, py = pos
+        col = int((px - self.x - self.gap) // (self.cWidth + self.gap))
+        row = int((py - self.y - self.gap) // (self.cHeight + self.gap))
+        if 0 <= col < self.c and 0 <= row < self.r:
+            x, y = self.get_cell_coords(row * self.c + col)
+            if x < px < x + self.cWidth and y < py < y + self.cHeight:
+                return row * self.c + col
+        return -1
+
+    # return the cell a drag from a cell to a mouse position ends on, with the drag snapped to the nearest of the 8
+    # directions and clamped to the edge of the board (works in whole cells, nothing is allocated)
+    def get_drag_cell(self, start, mousepos):
+        c = self.c
+        col = start % c
+        row = start // c
+        # cell delta from the start cell to the cell under the mouse (worked out like get_cell_at, but past the edge
+        # of the board and over the gaps too)
+        dx = int((mousepos[0] - self.x - self.gap) // (self.cWidth + self.gap)) - col
+        dy = int((mousepos[1] - self.y - self.gap) // (self.cHeight + self.gap)) - row
+        ax = abs(dx)
+        ay = abs(dy)
+        sx = (dx > 0) - (dx < 0)
+        sy = (dy > 0) - (dy < 0)
+        if ay * SNAP_DEN < ax * SNAP_NUM:  # horizontal
+            sy = 0
+            n = ax
+        elif ax * SNAP_DEN < ay * SNAP_NUM:  # vertical
+            sx = 0
+            n = ay
+        else:  # diagonal
+            n = (ax + ay + 1) // 2
+
+        # clamp to the number of cells left before the edge of the board
+        if sx > 0:
+            n = min(n, c - 1 - col)
+        elif sx < 0:
+            n = min(n, col)
+        if sy > 0:
+            n = min(n, self.r - 1 - row)
+        elif sy < 0:
+            n = min(n, row)
+        return start + n * (sy * c + sx)
+
+    # return x, y coordinates of a cell, given its index (worked out the same way as the grid's points)
+    def get_cell_coords(self, ind):
+        col = ind % self.c
+        row = ind // self.c
+        return (self.x + self.gap * (col + 1) + self.cWidth * col,
+                self.y + self.gap * (row + 1) + self.cHeight * row)
+
+    # the points of the cells are worked out from their index when needed, so they are not stored
+    def create_points(self):
+        return []
+
+    # iterate through the points of the cells (like a grid, without a stored list of points)
+    def __iter__(self):
+        return (self.get_cell_coords(ind) for ind in range(len(self)))
+
+    def __str__(self):
+        return ", ".join("(" + str(x) + ", " + str(y) + ")" for x, y in self)
+
+    # process cell clicks, releases and hovers (only the cell under the mouse and the cells hovered or clicked last
+    # time need to be looked at)
+    @profiler.timed("Board.process_events")
+    def process_events(self, click_bool, release_bool, mousepos):
+        self.released = []
+        self.clicked = []
+        self.hovered = []
+        candidates = set(self.touched)
+        hover_cell = self.get_cell_at(mousepos)
+        if hover_cell != -1:
+            candidates.add(hover_cell)
+        self.touched = []
+
+        for ind in sorted(candidates):
+            if self.active and (ind == hover_cell or ind in self.clicked_cells):
+                if click_bool:
+                    self.clicked_cells.add(ind)
+                    self.set_current_color(ind, self.onHoldColor)
+                    self.on_click(ind)
+                    self.clicked.append(ind)
+                elif release_bool and ind in self.clicked_cells:
+                    self.clicked_cells.discard(ind)
+                    self.set_current_color(ind, self.fill[ind])
+                    self.on_release(ind)
+                    self.released.append(ind)
+                else:
+                    if ind not in self.clicked_cells:
+                        self.set_current_color(ind, self.onHoverColor)
+                    self.hovered.append(ind)
+                self.touched.append(ind)
+            else:
+                self.set_current_color(ind, self.fill[ind])
+                if ind in self.clicked_cells:
+                    self.touched.append(ind)
+
+    # --------------------SETTER AND GETTER METHODS--------------------
+
+    # sets the colour a cell is showing, repainting it if it is a new colour
+    def set_current_color(self, ind, color):
+        if self.shown_colors[ind] != color:
+            self.shown_colors[ind] = color
+            self.cell_changed(ind)
+
+    # set the fill colour of a cell
+    def set_fill(self, ind, color):
+        self.fill[ind] = color
+        if ind not in self.clicked_cells:
+            self.set_current_color(ind, color)
+
+    def get_fill(self, ind):
+        return self.fill[ind]
+
+    def get_letter(self, ind):
+        return self.letters[ind]
+
+    def set_hoverColor(self, color):
+        self.onHoverColor = color
+
+    def set_holdColor(self, color):
+        self.onHoldColor = color
+        for ind in self.clicked_cells:
+            self.set_current_color(ind, color)
+
+    def set_bColor(self, color):
+        if color != self.bColor:
+            self.bColor = color
+            self.render_surface()
+            dirty.mark(self.rect)
+
+    # return the cell under the mouse, processing events again with the same cell and no clicks changes nothing
+    def get_hover_key(self, mousepos):
+        return self.get_cell_at(mousepos)
+
+    # return cell position (column, row) given the cell index
+    def get_button_pos(self, ind):
+        return ind % self.c, ind // self.c
+
+    # return cell index, given the position of the cell in the grid
+    def get_button_by_pos(self, x, y):
+        return y * self.c + x
+
+    # returns list of all clicked cells
+    def get_clicked(self):
+        return self.clicked
+
+    # returns list of all released cells
+    def get_released(self):
+        return self.released
+
+    # returns list of all hovered cells
+    def get_hovered(self):
+        return self.hovered
+
+    def set_active(self, b):
+        self.active = b
+
+    def set_visible(self, b):
+        if b != self.visible:
+            self.visible = b
+            dirty.mark(self.rect)
@@ -0,0 +1,89 @@
+# --------------------------------------------------------------------
+# Program: Board Cache
+# Author: Alex Hyde
+# Date: Dec 05 2019
+# Description: Keeps the most recently played boards so going back to
+#   a puzzle resets its board instead of building it again, and loads
+#   the board that is likely to be played next on a worker thread.
+#   Preparing is split in two: loading (reading the puzzle and finding
+#   its words, no pygame) runs on the worker thread, and building
+#   (surfaces and text) is only done on the main thread once the board
+#   is played. Only the latest guess is loaded, and guesses are kept
+#   apart from the played boards so they never push one out.
+# Input: Functions to load, build and reset a board, given its key
+#   (the puzzle index). Loading can run on both threads at once, so
+#   the load function has to lock anything it shares (e.g. the file
+#   the puzzles are read from).
+# --------------------------------------------------------------------
+
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+
+DEFAULT_CAPACITY = 4  # played boards kept
+
+
+# bounded cache of played boards, least recently used first
+class BoardCache:
+    def __init__(self, load, build, reset, capacity=DEFAULT_CAPACITY):
+        self.load = load  # key -> data needed to build the board (run on the worker thread, or the main thread)
+        self.build = build  # (key, data) -> board (main thread)
+        self.reset = reset  # board -> None, puts a cached board back to its starting state (main thread)
+        self.capacity = capacity
+        self.boards = OrderedDict()  # key -> board
+        self.preloaded = None  # (key, future of the data loaded by the worker thread) of the latest guess
+        self.executor = None  # worker thread, started on the first preload
+        self.hits = 0
+        self.misses = 0
+
+    # return the board for a key, reset if it was cached and built (from preloaded data if there is some) if not
+    def get(self, key):
+        board = self.boards.get(key)
+        if board is not None:
+            self.boards.move_to_end(key)
+            self.reset(board)
+            self.hits += 1
+            return board
+        self.misses += 1
+        data = None
+        if self.preloaded is not None and self.preloaded[0] == key:
+            future = self.preloaded[1]
+            self.preloaded = None
+            if not future.cancelled() and future.exception() is None:  # waits if the worker thread is still loading it
+                data = future.result()
+        if data is None:
+            data = self.load(key)
+        return self.add(key, self.build(key, data))
+
+    # add a board, dropping the least recently used boards over the capacity
+    def add(self, key, board):
+        self.boards[key] = board
+        self.boards.move_to_end(key)
+        while len(self.boards) > self.capacity:
+            self.boards.popitem(last=False)
+        return board
+
+    # load a board's data on the worker thread, unless it is cached or already loaded
+    # replaces the previous guess (it is dropped, or cancelled if it hasn't started), only the latest is worth loading
+    def preload(self, key):
+        if key in self.boards or (self.preloaded is not None and self.preloaded[0] == key):
+            return
+        if self.preloaded is not None:
+            self.preloaded[1].cancel()
+        if self.executor is None:
+            self.executor = ThreadPoolExecutor(1)
+        self.preloaded = (key, self.executor.submit(self.load, key))
+
+    # return if a board is cached
+    def __contains__(self, key):
+        return key in self.boards
+
+    def __len__(self):
+        return len(self.boards)
+
+    # drop every board and stop the worker thread
+    def close(self):
+        if self.executor is not None:
+            self.executor.shutdown(wait=True, cancel_futures=True)
+            self.executor = None
+        self.preloaded = None
+        self.boards.clear()
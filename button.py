@@ -10,10 +10,10 @@
 
 import pygame
 import label
+import dirty
+import profiler
 import color as c
 
-pygame.init()
-
 # alignment constants
 LEFT = 0
 RIGHT = 1
@@ -34,13 +34,24 @@ class ButtonList:
         self.hovered = []
         self.visible = True
         self.active = True
+        # spatial index used for hit testing (see set_grid and build_index)
+        self.layout = None  # (x, y, cell width, cell height, gap, columns, rows) of a regular grid of buttons
+        self.bucket_size = None
+        self.buckets = None  # (column, row) of a bucket -> buttons overlapping that bucket
+        self.positions = None  # button -> index in the list
+        self.sliders = None  # sliders in the list (always processed)
+        self.touched = []  # buttons that may not be showing their fill colour (hovered, clicked, released)
 
     # return button index, given the button
     def find(self, item):
-        if item in self.buttonList:
-            return self.buttonList.index(item)
-        else:
-            return -1
+        if self.positions is None:
+            self.update_positions()
+        return self.positions.get(item, -1)
+
+    # rebuild button index lookup and list of sliders
+    def update_positions(self):
+        self.positions = {b: i for i, b in enumerate(self.buttonList)}
+        self.sliders = [b for b in self.buttonList if type(b) == Slider]
 
     # returns button given its index
     def get(self, ind):
@@ -48,24 +59,99 @@ class ButtonList:
 
     def set(self, ind, new):
         self.buttonList[ind] = new
+        self.reindex()
+
+    # use arithmetic hit testing for buttons laid out in a regular grid (in row order, as created by grid.Menu)
+    def set_grid(self, x, y, cWidth, cHeight, gap, c, r):
+        self.layout = x, y, cWidth, cHeight, gap, c, r
+        self.buckets = None
+
+    # use a uniform bucket index for hit testing buttons in any layout
+    # the index has to be rebuilt (reindex) if buttons in the list are moved
+    def build_index(self, bucket_size=64):
+        self.layout = None
+        self.bucket_size = bucket_size
+        self.buckets = {}
+        for b in self.buttonList:
+            self.add_to_index(b)
+
+    # add a button to the bucket index
+    def add_to_index(self, b):
+        if type(b) == Slider:
+            return
+        x, y, w, h = b.rect()
+        size = self.bucket_size
+        for bx in range(int(x // size), int((x + w) // size) + 1):
+            for by in range(int(y // size), int((y + h) // size) + 1):
+                self.buckets.setdefault((bx, by), []).append(b)
+
+    # rebuild the indexes after the buttons in the list have been changed or moved
+    def reindex(self):
+        self.positions = None
+        if self.buckets is not None:
+            self.build_index(self.bucket_size)
+        elif self.layout is not None and len(self.buttonList) != self.layout[5] * self.layout[6]:
+            self.layout = None  # no longer a regular grid
+
+    # return if the list can hit test through an index instead of checking every button
+    def is_indexed(self):
+        return self.layout is not None or self.buckets is not None
 
     # return button at a set of coordinates, -1 if the is no button at those coordinates
     def get_button_at(self, pos):
+        if self.layout is not None:
+            x, y, cWidth, cHeight, gap, c, r = self.layout
+            col = int((pos[0] - x - gap) // (cWidth + gap))
+            row = int((pos[1] - y - gap) // (cHeight + gap))
+            if 0 <= col < c and 0 <= row < r:
+                b = self.buttonList[row * c + col]
+                if b.is_hover(pos):
+                    return b
+            return -1
+
+        if self.buckets is not None:
+            size = self.bucket_size
+            for b in self.buckets.get((int(pos[0] // size), int(pos[1] // size)), ()):
+                if b.is_hover(pos):
+                    return b
+            return -1
+
         for b in self.buttonList:
             if b.is_hover(pos):
                 return b
         return -1
 
+    # return what processing events at a mouse position depends on (the button under the mouse, and the position
+    # itself if there are sliders), processing again with the same key and no clicks changes nothing
+    def get_hover_key(self, mousepos):
+        if self.positions is None:
+            self.update_positions()
+        if self.sliders:
+            return self.get_button_at(mousepos), tuple(mousepos)
+        return self.get_button_at(mousepos)
+
     def draw(self, win):
         if self.visible:  # if button list is visible
+            clip = win.get_clip()
             for b in self.buttonList:
-                b.draw(win)
+                if clip.colliderect(b.rect()):  # skip buttons outside of the area being redrawn
+                    b.draw(win)
 
     def add(self, button):
         self.buttonList.append(button)
+        self.positions = None
+        if self.buckets is not None:
+            self.add_to_index(button)
+        elif self.layout is not None:
+            self.reindex()
 
     # process button clicks, releases and hovers
+    @profiler.timed("ButtonList.process_events")
     def process_events(self, click_bool, release_bool, mousepos):
+        if self.is_indexed():
+            self.process_indexed_events(click_bool, release_bool, mousepos)
+            return
+
         self.released = []
         self.clicked = []
         self.hovered = []
@@ -94,6 +180,48 @@ class ButtonList:
                 else:
                     b.reset_color()
 
+    # same as process_events, but only processes the button under the mouse and the buttons that were hovered or
+    # clicked last time (every other button is already showing its fill colour)
+    def process_indexed_events(self, click_bool, release_bool, mousepos):
+        self.released = []
+        self.clicked = []
+        self.hovered = []
+        if self.positions is None:
+            self.update_positions()
+        candidates = set(self.touched)
+        hover_button = self.get_button_at(mousepos)
+        if hover_button != -1:
+            candidates.add(hover_button)
+        candidates = sorted(candidates, key=self.find)  # process in list order, like process_events
+        self.touched = []
+
+        if self.active:
+            for s in self.sliders:
+                s.process(click_bool, release_bool, mousepos)
+            for b in candidates:
+                if (b is hover_button or b.is_clicked) and b.is_active():
+                    if click_bool:
+                        b.on_click_default()
+                        b.on_click(b)
+                        self.clicked.append(b)
+                    elif release_bool and b.is_clicked:
+                        b.on_release_default()
+                        b.on_release(b)
+                        self.released.append(b)
+                    else:
+                        b.on_hover()
+                        self.hovered.append(b)
+                    self.touched.append(b)
+                else:
+                    b.reset_color()
+                    if b.is_clicked:
+                        self.touched.append(b)
+        else:
+            for s in self.sliders:
+                s.slide_button.reset_color()
+            for b in candidates:
+                b.reset_color()
+
     # return all clicked buttons
     def get_clicked(self):
         return self.clicked
@@ -107,7 +235,10 @@ class ButtonList:
         return self.hovered
 
     def set_visible(self, b):
-        self.visible = b
+        if b != self.visible:
+            self.visible = b
+            for but in self.buttonList:
+                dirty.mark(but.rect())  # shown or hidden with the list, even if the button itself is visible
 
     def set_active(self, b):
         self.active = b
@@ -148,11 +279,11 @@ class Button:
         self.onHoverColor = onHoverColor
         self.bColor = bColor
         self.tColor = tColor
+        self.visible = visible
         # rendering text drawable
         self.rendered_text = None
         self.render_text()
 
-        self.visible = visible
         self.active = active
         self.is_clicked = False
         self.is_hovered = False
@@ -179,12 +310,24 @@ class Button:
     def render_text(self):
         self.rendered_text = label.Label(self.text, color=self.tColor, size=self.text_size)
         self.reset_text_pos()
+        self.mark_dirty()
 
     # sets text drawable position (based on alignment)
     def reset_text_pos(self):
         self.rendered_text.set_x(self.x + (self.w-self.rendered_text.get_width())*self.tAlignx)
         self.rendered_text.set_y(self.y + (self.h-self.rendered_text.get_height())*self.tAligny)
 
+    # marks the button's area as changed (used by retained frames)
+    def mark_dirty(self):
+        if self.visible:
+            dirty.mark(self.rect())
+
+    # sets the colour currently filling the button, marking the button as changed if it is a new colour
+    def set_current_color(self, color):
+        if color != self.currentFillColor:
+            self.currentFillColor = color
+            self.mark_dirty()
+
     # empty function (to be replaced by custom functions in instantiated button objects)
     def blank_func(self, blank):
         pass
@@ -196,18 +339,18 @@ class Button:
 
     # default function when button if clicked (change color)
     def on_click_default(self):
-        self.currentFillColor = self.onHoldColor
+        self.set_current_color(self.onHoldColor)
         self.is_clicked = True
 
     # default function when button if released (change color)
     def on_release_default(self):
-        self.currentFillColor = self.fColor
+        self.set_current_color(self.fColor)
         self.is_clicked = False
 
     # default function when button if hovered (change color)
     def on_hover(self):
         if not self.is_clicked:
-            self.currentFillColor = self.onHoverColor
+            self.set_current_color(self.onHoverColor)
 
     def convert_to_slider(self, slide_wh, change=False, text_slider_percent=50, color=c.WHITE, bColor=c.BLACK, border=1,
                           start_value=0, end_value=100, slide_value=None, slide_color=c.BLACK, text_size=18,
@@ -228,13 +371,17 @@ class Button:
 
     def set_x(self, x):
         xdif = x - self.x
+        self.mark_dirty()
         self.x += xdif
         self.rendered_text.set_x(self.rendered_text.x + xdif)
+        self.mark_dirty()
 
     def set_y(self, y):
         ydif = y - self.y
+        self.mark_dirty()
         self.y += ydif
         self.rendered_text.set_y(self.rendered_text.y + ydif)
+        self.mark_dirty()
 
     def get_text(self):
         return self.text
@@ -249,23 +396,25 @@ class Button:
     def set_fColor(self, color):
         self.fColor = color
         if not self.is_clicked and not self.is_hovered:
-            self.currentFillColor = self.fColor
+            self.set_current_color(self.fColor)
 
     def set_hoverColor(self, color):
         self.onHoverColor = color
         if self.is_hovered and not self.is_clicked:
-            self.currentFillColor = self.onHoverColor
+            self.set_current_color(self.onHoverColor)
 
     def set_holdColor(self, color):
         self.onHoldColor = color
         if not self.is_hovered and self.is_clicked:
-            self.currentFillColor = self.onHoldColor
+            self.set_current_color(self.onHoldColor)
 
     def set_bColor(self, color):
-        self.bColor = color
+        if color != self.bColor:
+            self.bColor = color
+            self.mark_dirty()
 
     def reset_color(self):
-        self.currentFillColor = self.fColor
+        self.set_current_color(self.fColor)
 
     def set_active(self, torf):
         self.active = torf
@@ -274,7 +423,9 @@ class Button:
         return self.active
 
     def set_visible(self, torf):
-        self.visible = torf
+        if torf != self.visible:
+            dirty.mark(self.rect())  # the area it is shown in, or was shown in before it was hidden
+            self.visible = torf
 
     def is_visible(self):
         return self.visible
@@ -406,6 +557,7 @@ class Slider:
         return self.x, self.y, self.w, self.h
 
     def process(self, click_bool, release_bool, mousepos):
+        old_value = self.slide_value
         if (self.slide_button.is_hover(mousepos) or self.slide_button.is_clicked) and self.slide_button.is_active():
             if click_bool:
                 self.slide_button.on_click_default()
@@ -427,14 +579,21 @@ class Slider:
 
         self.slide_value = self.start_value + (self.end_value - self.start_value) * self.convert_slider_pos_to_percent()
 
-        if self.is_dynamic_text:
-            self.render_text()
+        if self.slide_value != old_value:
+            self.mark_dirty()
+            if self.is_dynamic_text:
+                self.render_text()
 
         self.action(self)
 
     def is_visible(self):
         return self.visible
 
+    # marks the slider's area as changed (used by retained frames)
+    def mark_dirty(self):
+        if self.visible:
+            dirty.mark(self.rect())
+
     def get_label(self):
         return self.rendered_text
 
@@ -448,3 +607,4 @@ class Slider:
             raise Exception("Slider value outside of slider range")
         self.buttonx = self.slide_x1 + (self.slide_x2 - self.slide_x1) * self.convert_slider_value_to_percent()
         self.slide_button.set_x(self.buttonx - self.slide_button.w / 2)
+        self.mark_dirty()
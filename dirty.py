@@ -0,0 +1,53 @@
+# --------------------------------------------------------------------
+# Program: Dirty Region Tracking
+# Author: Alex Hyde
+# Date: Nov 20 2019
+# Description: Collects the screen areas that changed since the last
+#   frame was drawn. Drawables mark their rect when they change and a
+#   retained frame only redraws and updates those areas.
+# --------------------------------------------------------------------
+
+import pygame
+
+# above this many rects, they are joined into one rect (drawing every drawable once per rect gets slower than
+# drawing the union once)
+MAX_RECTS = 16
+
+_rects = []  # areas changed since the last take()
+_full = False  # if the whole screen has to be redrawn
+_shown = None  # frame that was last drawn to the screen
+
+
+# mark a rect (x, y, w, h) as changed
+def mark(rect):
+    x, y, w, h = rect
+    # grow by a pixel on every side so float positions that get truncated are still covered
+    _rects.append(pygame.Rect(int(x) - 1, int(y) - 1, int(w) + 3, int(h) + 3))
+
+
+# mark the whole screen as changed
+def mark_all():
+    global _full
+    _full = True
+
+
+# return if the whole screen is marked and the list of changed rects, and reset both
+def take():
+    global _full, _rects
+    full = _full
+    rects = _rects
+    _full = False
+    _rects = []
+    if len(rects) > MAX_RECTS:
+        rects = [rects[0].unionall(rects[1:])]
+    return full, rects
+
+
+# set and get the frame that was last drawn to the screen
+def set_shown(frame):
+    global _shown
+    _shown = frame
+
+
+def get_shown():
+    return _shown
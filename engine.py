@@ -0,0 +1,92 @@
+# --------------------------------------------------------------------
+# Program: Word Search Engine
+# Author: Alex Hyde
+# Date: Nov 30 2019
+# Description: Game state of one word search, without pygame. Holds
+#   the puzzle, the words found so far and the cells they use, and
+#   checks selections (a drag from one cell to another). The pygame
+#   WordSearch in main_wordsearch is a view over a GameState, and the
+#   state can be played headless by tests, tools and servers.
+# Input: Selections given as the cell indices at both ends of a drag
+#   (index = row * columns + column).
+# --------------------------------------------------------------------
+
+import linetable
+
+
+# result of a selection
+class SelectResult:
+    def __init__(self, cells, word=None, new=False, complete=False):
+        self.cells = cells  # cell indices selected (empty if the cells are not on a line)
+        self.word = word  # word placed on the selected cells, None if there isn't one
+        self.new = new  # if the word hadn't been found before
+        self.complete = complete  # if every word has been found
+
+
+# state of a word search game
+class GameState:
+    def __init__(self, puzzle, lines=None):
+        self.puzzle = puzzle
+        self.r = puzzle.r
+        self.c = puzzle.c
+        self.words = puzzle.words
+        # cells between any two cells, where every word is placed and the set of words (built here unless it was
+        # already built, it is read only and can be shared by every game of the puzzle)
+        self.lines = lines if lines is not None else linetable.build(puzzle)
+        self.found = set()  # words found
+        self.found_order = []  # words found, in the order they were found
+        self.used_cells = set()  # cells used by found words
+        self.found_words = 0
+
+    # return cell index, given the position (column, row) of the cell
+    def get_cell(self, x, y):
+        return y * self.c + x
+
+    # return the position (column, row) of a cell, given its index
+    def get_cell_pos(self, ind):
+        return ind % self.c, ind // self.c
+
+    # return the cells from one cell to another (both included), empty if they aren't on a straight or diagonal line
+    def get_line(self, start, end):
+        cells = self.lines.line(start, end)
+        if cells is None:
+            return range(0)
+        return cells
+
+    # select the cells from one cell to another, returns the result of the selection
+    # (a word found again is reported, but isn't counted a second time)
+    def select(self, start, end):
+        cells = self.get_line(start, end)
+        word = None
+        new = False
+        if len(cells) > 0:
+            word = self.lines.word_at(start, end)
+        if word is not None and word not in self.found:
+            self.found.add(word)
+            self.found_order.append(word)
+            self.found_words += 1
+            new = True
+        if word is not None:
+            self.used_cells.update(cells)
+        return SelectResult(cells, word, new, self.is_complete())
+
+    # return if every word has been found
+    def is_complete(self):
+        return len(self.found) == len(self.lines.word_set)
+
+    def is_found(self, word):
+        return word in self.found
+
+    def is_used(self, ind):
+        return ind in self.used_cells
+
+    # return list of words not found yet (in word list order)
+    def get_remaining(self):
+        return [w for w in self.words if w not in self.found]
+
+    # forget every word found
+    def reset(self):
+        self.found = set()
+        self.found_order = []
+        self.used_cells = set()
+        self.found_words = 0
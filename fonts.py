@@ -0,0 +1,191 @@
+# --------------------------------------------------------------------
+# Program: Font and Text Cache
+# Author: Alex Hyde
+# Date: Nov 20 2019
+# Description: Process wide registry of loaded fonts and a bounded
+#   cache of rendered text surfaces, shared by every label and button
+#   so that the same font or text is never loaded or rendered twice.
+#   Font names are resolved to font files once and the paths are kept
+#   in a cache file, so later runs load fonts straight from their files
+#   without scanning the system fonts.
+# Input: python fonts.py [font name ...] times resolving and loading
+#   fonts without and with the font path cache.
+# --------------------------------------------------------------------
+
+from collections import OrderedDict
+import json
+import os
+import sys
+import tempfile
+import time
+import warnings
+import pygame
+import profiler
+
+# default maximum number of rendered text surfaces kept in the cache
+DEFAULT_CACHE_SIZE = 2048
+FONT_CACHE_VERSION = 1
+
+_fonts = {}  # (font name, size) -> pygame font object
+_rendered = OrderedDict()  # (text, font name, size, colour) -> rendered surface, least recently used first
+_cache_size = DEFAULT_CACHE_SIZE
+# font name -> font file path (None for pygame's default font), read from the cache file when needed
+_font_paths = None
+_warned = set()  # font names already warned about
+
+
+# return the default font path cache file (in the user's cache folder)
+def default_font_cache_path():
+    folder = os.environ.get("XDG_CACHE_HOME") or os.path.join(os.path.expanduser("~"), ".cache")
+    return os.path.join(folder, "wordsearch", "fonts.json")
+
+
+_font_cache_path = default_font_cache_path()
+
+
+# set the font path cache file (None keeps resolved paths in memory only)
+def set_font_cache_path(path):
+    global _font_cache_path, _font_paths
+    _font_cache_path = path
+    _font_paths = None
+
+
+def get_font_cache_path():
+    return _font_cache_path
+
+
+# return what the cached paths depend on (a different pygame or platform may find different fonts)
+def font_cache_key():
+    return [pygame.version.ver, sys.platform]
+
+
+# return dictionary of font name -> path from the cache file, empty if it is missing, unreadable or out of date
+# (only fonts that were found are saved, so the file has no None paths)
+def load_font_paths():
+    if _font_cache_path is None:
+        return {}
+    try:
+        with open(_font_cache_path, "r") as f:
+            data = json.load(f)
+        if data.get("version") == FONT_CACHE_VERSION and data.get("key") == font_cache_key():
+            return {font: path for font, path in dict(data["fonts"]).items() if path is not None}
+    except (OSError, ValueError, KeyError, TypeError, AttributeError):
+        pass  # missing or unreadable cache, fonts are resolved again
+    return {}
+
+
+# write the resolved font paths to the cache file, keeping the paths other processes saved to it
+# written to a temporary file first, so processes saving at the same time never read a half written file
+# fonts that weren't found aren't saved, they are looked for again by the next process (they may be installed since)
+def save_font_paths():
+    if _font_cache_path is None:
+        return
+    paths = load_font_paths()
+    paths.update((font, path) for font, path in _font_paths.items() if path is not None)
+    temp = _font_cache_path + "." + str(os.getpid()) + ".tmp"
+    try:
+        folder = os.path.dirname(_font_cache_path)
+        if folder:
+            os.makedirs(folder, exist_ok=True)
+        with open(temp, "w") as f:
+            json.dump({"version": FONT_CACHE_VERSION, "key": font_cache_key(), "fonts": paths}, f)
+        os.replace(temp, _font_cache_path)
+    except OSError:
+        pass  # fonts still load without a saved cache (e.g. read only home folder)
+    finally:
+        if os.path.exists(temp):  # left behind if writing or replacing failed
+            try:
+                os.remove(temp)
+            except OSError:
+                pass
+
+
+# return the file path of a font name (None for pygame's default font, with a warning if the font wasn't found)
+# the system fonts are only scanned for names not in the cache file (or whose file is gone), a font that wasn't
+# found stays on the default font for the rest of the process
+def resolve_font(font):
+    global _font_paths
+    if _font_paths is None:
+        _font_paths = load_font_paths()
+    if font in _font_paths and (_font_paths[font] is None or os.path.exists(_font_paths[font])):
+        path = _font_paths[font]
+    else:
+        path = pygame.font.match_font(font) if font else None
+        _font_paths[font] = path
+        if path is not None:
+            save_font_paths()
+    if path is None and font and font not in _warned:
+        _warned.add(font)
+        warnings.warn("Font '" + font + "' was not found, the default font is used instead")
+    return path
+
+
+# return the font object for a font name and size, loading it only the first time it is asked for
+def get_font(font, size):
+    profiler.count("font lookups")
+    key = (font, size)
+    f = _fonts.get(key)
+    if f is None:
+        if not pygame.font.get_init():
+            pygame.font.init()
+        f = pygame.font.Font(resolve_font(font), size)
+        _fonts[key] = f
+    return f
+
+
+# return a rendered (anti-aliased) text surface, reusing a cached surface when the same text was rendered before
+# the returned surface is shared, so it must not be drawn on
+def render_text(text, font, size, color):
+    key = (text, font, size, tuple(color))
+    surf = _rendered.get(key)
+    if surf is not None:
+        _rendered.move_to_end(key)
+        return surf
+    profiler.count("text renders")  # not in the cache
+    surf = get_font(font, size).render(text, True, color)
+    if _cache_size > 0:
+        _rendered[key] = surf
+        while len(_rendered) > _cache_size:
+            _rendered.popitem(last=False)
+    return surf
+
+
+# set the maximum number of rendered surfaces kept (0 disables the rendered text cache)
+def set_cache_size(size):
+    global _cache_size
+    if size < 0:
+        raise ValueError("Cache size cannot be negative")
+    _cache_size = size
+    while len(_rendered) > _cache_size:
+        _rendered.popitem(last=False)
+
+
+def get_cache_size():
+    return _cache_size
+
+
+# empty both caches (needed if pygame.font is quit and re-initialized)
+def clear():
+    _fonts.clear()
+    _rendered.clear()
+
+
+# return seconds taken to resolve and load fonts (at size 18)
+def time_fonts(names):
+    start = time.perf_counter()
+    for name in names:
+        pygame.font.Font(resolve_font(name), 18)
+    return time.perf_counter() - start
+
+
+if __name__ == "__main__":
+    font_names = sys.argv[1:] or ["lucida bright"]
+    pygame.font.init()
+    with tempfile.TemporaryDirectory() as cache_folder:
+        set_font_cache_path(os.path.join(cache_folder, "fonts.json"))
+        cold = time_fonts(font_names)  # scans the system fonts
+        set_font_cache_path(get_font_cache_path())  # forget the resolved paths, they are read from the file again
+        warm = time_fonts(font_names)
+    print("cold start %.1f ms, warm start %.1f ms (%d fonts)" % (cold * 1000, warm * 1000, len(font_names)))
+    for name in font_names:
+        print("  " + name + ": " + str(resolve_font(name)))
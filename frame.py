@@ -4,34 +4,71 @@
 # Date: Oct 25 2019
 # Description: Class for storing and processing all drawable and
 #   button of a current screen. Used for storing different screens
-#   such as menus and game screens.
+#   such as menus and game screens. A retained frame only redraws the
+#   areas marked as changed by its drawables.
 # --------------------------------------------------------------------
 
 import button
+import dirty
+import profiler
 import pygame
 
 
 # frame class for storing and processing current drawables and buttons
 class Frame:
-    def __init__(self, drawables, button_list=None, fill=(255, 255, 255)):
+    def __init__(self, drawables, button_list=None, fill=(255, 255, 255), retained=False):
         self.drawables = drawables
         if button_list is None:
             button_list = []
         self.button_lists = button_list
         self.fill = fill
+        self.retained = retained  # only redraw changed areas in redraw()
+        self.full_redraw = True  # if the next redraw() has to draw everything
 
+    @profiler.timed("Frame.draw")
     def draw(self, win):
         win.fill(self.fill)
         for d in self.drawables:
             d.draw(win)
 
+    # draw the frame and return the list of rects that changed on the surface (to be passed to display.update)
+    # a retained frame only redraws the areas marked in the dirty module since its last redraw
+    def redraw(self, win):
+        full, rects = dirty.take()
+        if not self.retained or full or self.full_redraw or dirty.get_shown() is not self:
+            self.draw(win)
+            self.full_redraw = False
+            dirty.set_shown(self)
+            return [win.get_rect()]
+
+        clip = win.get_clip()
+        for r in rects:
+            win.set_clip(r)
+            self.draw(win)
+        win.set_clip(clip)
+        return rects
+
+    # force the whole frame to be redrawn on the next redraw()
+    def invalidate(self):
+        self.full_redraw = True
+
+    def set_fill(self, color):
+        self.fill = color
+        self.invalidate()
+
     # process buttons
+    @profiler.timed("Frame.process_events")
     def process_events(self, click_bool, release_bool, mousepos):
         for button_list in self.button_lists:
             button_list.process_events(click_bool, release_bool, mousepos)
 
+    # return what processing events at a mouse position depends on, for every button list
+    def get_hover_key(self, mousepos):
+        return tuple(button_list.get_hover_key(mousepos) for button_list in self.button_lists)
+
     def add(self, drawable):
         self.drawables.append(drawable)
+        self.invalidate()
 
     # return surface object with the current screen of the frame
     def get_screen(self, w, h):
@@ -0,0 +1,154 @@
+# --------------------------------------------------------------------
+# Program: Puzzle Generator
+# Author: Alex Hyde
+# Date: Nov 22 2019
+# Description: Generates word search puzzles by placing words in a
+#   grid in all 8 directions (words may cross where their letters
+#   match) and filling the rest of the grid with random letters.
+#   Large batches are generated across a process pool, each puzzle
+#   with its own seed so the output is the same every run, and are
+#   written to the puzzle file as they finish.
+# Input: python generator.py themes.txt output.txt [--count N]
+#   [--rows N] [--cols N] [--words N] [--seed N] [--workers N]
+#   Each line of the themes file is "Theme: WORD WORD WORD ...".
+#   The output can be read by puzzle.read_in_puzzles.
+# --------------------------------------------------------------------
+
+import random
+import string
+import sys
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+
+import puzzle
+import solver
+
+# number of random start cells and directions tried for a word before giving up on it
+PLACE_TRIES = 200
+# the puzzle count is written first and filled in at the end, padded to this width so it can be rewritten in place
+COUNT_WIDTH = 10
+
+
+# return the word as it appears in the grid (upper case letters only)
+def clean_word(word):
+    return "".join(ch for ch in word.upper() if ch in string.ascii_uppercase)
+
+
+# try to place a word in the grid, returns True if it was placed
+def place_word(letters, r, c, word, rng):
+    length = len(word)
+    for i in range(PLACE_TRIES):
+        dx, dy = rng.choice(solver.DIRECTIONS)
+        # pick a start cell that keeps the whole word on the board
+        xs = range(length - 1, c) if dx < 0 else range(c - (length - 1) * dx)
+        ys = range(length - 1, r) if dy < 0 else range(r - (length - 1) * dy)
+        if not xs or not ys:
+            continue
+        x, y = rng.choice(xs), rng.choice(ys)
+        cells = [(y + dy * j) * c + x + dx * j for j in range(length)]
+        # cells can be shared with other words if they hold the same letter
+        if all(letters[ind] is None or letters[ind] == ch for ind, ch in zip(cells, word)):
+            for ind, ch in zip(cells, word):
+                letters[ind] = ch
+            return True
+    return False
+
+
+# return a puzzle with the words placed in an r x c grid (words that don't fit are left out of the puzzle)
+def generate_puzzle(title, words, r, c, seed):
+    rng = random.Random(seed)
+    letters = [None] * (r * c)
+    placed = []
+    # longest words first, while the grid still has room for them
+    for w in sorted({clean_word(w) for w in words if clean_word(w)}, key=lambda w: (-len(w), w)):
+        if len(w) <= max(r, c) and place_word(letters, r, c, w, rng):
+            placed.append(w)
+    for i in range(len(letters)):
+        if letters[i] is None:
+            letters[i] = rng.choice(string.ascii_uppercase)
+    rng.shuffle(placed)
+    return puzzle.Puzzle(title, letters, placed, c, r)
+
+
+# generate one puzzle from a job tuple (title, words, rows, columns, seed) and return it in the file format
+# (runs in the worker processes, text is much cheaper to send back than a puzzle object)
+def generate_job(job):
+    title, words, r, c, seed = job
+    return puzzle.format_puzzle(generate_puzzle(title, words, r, c, seed))
+
+
+# return the seed of the n-th puzzle of a batch (string seeds are hashed the same way in every process)
+def puzzle_seed(seed, n):
+    return str(seed) + "-" + str(n)
+
+
+# yield a job for each puzzle of a batch, cycling through the themes
+# themes is a list of (theme name, word list)
+def make_jobs(themes, count, r, c, word_count, seed=0):
+    for n in range(count):
+        name, words = themes[n % len(themes)]
+        rng = random.Random(puzzle_seed(seed, n))
+        chosen = rng.sample(words, min(word_count, len(words)))
+        yield name + " #" + str(n // len(themes) + 1), chosen, r, c, puzzle_seed(seed, n)
+
+
+# generate every job on a process pool and write the puzzles to a file in job order as they finish
+# at most `window` puzzles are waiting to be written at once, so memory stays flat however big the batch is
+# returns the number of puzzles written
+def generate_file(jobs, path, workers=None, window=None):
+    if window is None:
+        window = 4 * (workers or 4)
+    count = 0
+    with open(path, "w") as file, ProcessPoolExecutor(workers) as pool:
+        file.write(" " * COUNT_WIDTH + "\n")  # puzzle count placeholder
+        pending = deque()
+        for job in jobs:
+            pending.append(pool.submit(generate_job, job))
+            if len(pending) >= window:
+                file.write(pending.popleft().result())
+                count += 1
+        while pending:
+            file.write(pending.popleft().result())
+            count += 1
+        file.seek(0)
+        file.write(str(count).rjust(COUNT_WIDTH))
+    return count
+
+
+# return list of (theme name, word list) from a themes file
+def read_themes(file):
+    themes = []
+    for line in file:
+        if ":" in line:
+            name, words = line.split(":", 1)
+            words = [w for w in words.split() if clean_word(w)]
+            if words:
+                themes.append((name.strip(), words))
+    return themes
+
+
+if __name__ == "__main__":
+    args = sys.argv[1:]
+    options = {"--count": 100, "--rows": 15, "--cols": 15, "--words": 8, "--seed": 0, "--workers": None}
+    paths = []
+    i = 0
+    while i < len(args):
+        if args[i] in options:
+            options[args[i]] = int(args[i + 1])
+            i += 1
+        else:
+            paths.append(args[i])
+        i += 1
+    if len(paths) != 2:
+        print("usage: python generator.py themes.txt output.txt [--count N] [--rows N] [--cols N] [--words N] "
+              "[--seed N] [--workers N]")
+        sys.exit(2)
+
+    with open(paths[0], "r") as f:
+        theme_list = read_themes(f)
+    if not theme_list:
+        print("No themes in " + paths[0])
+        sys.exit(1)
+    n = generate_file(make_jobs(theme_list, options["--count"], options["--rows"], options["--cols"],
+                                options["--words"], options["--seed"]), paths[1], options["--workers"])
+    print("Wrote " + str(n) + " puzzles to " + paths[1])
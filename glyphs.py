@@ -0,0 +1,114 @@
+# --------------------------------------------------------------------
+# Program: Glyph Atlas
+# Author: Alex Hyde
+# Date: Nov 27 2019
+# Description: Renders each character of a font, size and colour once
+#   into a single shared surface. Letters are drawn by blitting an
+#   area of that surface, so every letter cell of every board draws
+#   from the same texture instead of its own rendered text.
+# --------------------------------------------------------------------
+
+import string
+import pygame
+import fonts
+
+# characters rendered into a new atlas (others are added the first time they are used)
+DEFAULT_CHARSET = string.ascii_uppercase
+PADDING = 1  # space between glyphs in the atlas
+
+_atlases = {}  # (font name, size, colour) -> atlas
+_generation = 0  # increased every time the atlases are invalidated
+
+
+# surface holding the glyphs of one font, size and colour
+class GlyphAtlas:
+    def __init__(self, font, size, color, charset=DEFAULT_CHARSET):
+        self.font = font
+        self.size = size
+        self.color = tuple(color)
+        self.generation = _generation
+        self.surface = None
+        self.rects = {}  # character -> area of the character in the surface
+        self.subsurfaces = {}  # character -> subsurface sharing the atlas' pixels
+        self.charset = ""
+        self.add(charset)
+
+    # add characters to the atlas (the atlas surface is rebuilt with the new characters)
+    def add(self, chars):
+        new = "".join(ch for ch in dict.fromkeys(chars) if ch not in self.rects)
+        if not new:
+            return
+        self.charset += new
+        rendered = [fonts.get_font(self.font, self.size).render(ch, True, self.color) for ch in self.charset]
+        width = sum(g.get_width() + PADDING for g in rendered)
+        height = max(g.get_height() for g in rendered)
+        surface = pygame.Surface((max(width, 1), max(height, 1)), pygame.SRCALPHA)
+        self.rects = {}
+        x = 0
+        for ch, g in zip(self.charset, rendered):
+            surface.blit(g, (x, 0))
+            self.rects[ch] = pygame.Rect(x, 0, g.get_width(), g.get_height())
+            x += g.get_width() + PADDING
+        if pygame.display.get_init() and pygame.display.get_surface() is not None:
+            surface = surface.convert_alpha()  # same pixel format as the window for faster blits
+        self.surface = surface
+        self.subsurfaces = {}
+
+    # return the area of a character in the atlas surface
+    def get_rect(self, ch):
+        rect = self.rects.get(ch)
+        if rect is None:
+            self.add(ch)
+            rect = self.rects[ch]
+        return rect
+
+    # return a surface for a character that shares the atlas' pixels
+    def glyph(self, ch):
+        g = self.subsurfaces.get(ch)
+        if g is None:
+            rect = self.get_rect(ch)  # may rebuild the atlas surface, so it is looked up before the surface is
+            g = self.surface.subsurface(rect)
+            self.subsurfaces[ch] = g
+        return g
+
+    # draw a character at a position
+    def blit(self, win, ch, pos):
+        win.blit(self.surface, pos, self.get_rect(ch))
+
+    # draw a string, one glyph after another
+    def blit_text(self, win, text, pos):
+        x, y = pos
+        blits = []
+        for ch in text:
+            rect = self.get_rect(ch)
+            blits.append((self.surface, (x, y), rect))
+            x += rect.w
+        win.blits(blits, False)
+
+    # return width of a string drawn by blit_text
+    def text_width(self, text):
+        return sum(self.get_rect(ch).w for ch in text)
+
+
+# return the shared atlas for a font, size and colour
+def get_atlas(font, size, color):
+    key = (font, size, tuple(color))
+    atlas = _atlases.get(key)
+    if atlas is None:
+        atlas = GlyphAtlas(font, size, color)
+        _atlases[key] = atlas
+    return atlas
+
+
+# drop every atlas and rendered text (e.g. when the theme or fonts change), anything drawing from an atlas or
+# a rendered text should get a new one
+def invalidate_all():
+    global _generation
+    _atlases.clear()
+    fonts.clear()
+    _generation += 1
+
+
+# return the current atlas generation, used to tell if atlases were invalidated since an atlas was taken
+def get_generation():
+    return _generation
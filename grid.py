@@ -11,8 +11,7 @@
 import pygame
 import label
 import button
-
-pygame.init()
+import dirty
 
 # colours
 WHITE = (255, 255, 255)
@@ -85,12 +84,14 @@ class Grid:
 
     def set_visible(self, b):
         self.visible_lines = b
+        dirty.mark(self.rect)
 
     def is_visible(self, b):
         return self.visible_lines
 
     def set_color(self, color):
         self.color = color
+        dirty.mark(self.rect)
 
     def __str__(self):
         return ", ".join(list(map(lambda a: "(" + str(a[0]) + ", " + str(a[1]) + ")", self.points)))
@@ -135,6 +136,7 @@ class Menu(Grid):
                 b.on_click = b_on_click
             b_list.add(b)
             del t_list[0]
+        b_list.set_grid(self.x, self.y, self.cWidth, self.cHeight, self.gap, self.c, self.r)  # fast hit testing
         return b_list
 
     def draw(self, win):
@@ -186,6 +188,112 @@ class Menu(Grid):
         return 
 
 
+# scrollable menu for long lists of items, only the visible rows exist as buttons
+# the buttons are reused as the list scrolls and an item's text is only rendered when its row comes into view
+class ScrollMenu(Menu):
+    def __init__(self, rect, rows, item_count, get_text, gap=0, button_on_click=None, color=BLACK,
+                 visible_lines=True, active=True, visible=True, text_size=18):
+        # get_text = function returning the text of an item, given the item's index
+        rows = max(1, min(rows, item_count))
+        super().__init__(rect, rows, 1, [""] * rows, gap, button_on_click, color, visible_lines, active, visible)
+        self.item_count = item_count
+        self.get_text = get_text
+        self.text_size = text_size
+        self.offset = 0  # index of the item in the first row
+        self.bar_color = color
+        for b in self.button_list:
+            b.set_text_size(text_size)
+        self.update_rows()
+
+    # set the text of each row to the item it is showing, hiding rows past the last item
+    def update_rows(self):
+        for row, b in enumerate(self.button_list):
+            ind = self.offset + row
+            if ind < self.item_count:
+                b.set_text(self.get_text(ind))
+                b.set_visible(self.visible)
+                b.set_active(True)
+            else:
+                b.set_visible(False)
+                b.set_active(False)
+        dirty.mark(self.scroll_bar_rect(True))
+
+    # scroll the list by a number of rows (negative scrolls up)
+    def scroll(self, rows):
+        self.scroll_to(self.offset + rows)
+
+    # scroll so an item is in the first row (as far as the end of the list allows)
+    def scroll_to(self, ind):
+        ind = max(0, min(ind, self.item_count - self.r))
+        if ind != self.offset:
+            self.offset = ind
+            self.update_rows()
+
+    # scroll with the mouse wheel (over the menu) and the up/down, page up/down, home and end keys
+    # returns if the event scrolled the list
+    def process_scroll(self, event):
+        old = self.offset
+        if event.type == pygame.MOUSEWHEEL:
+            x, y = pygame.mouse.get_pos()
+            if self.x <= x <= self.x + self.w + 20 and self.y <= y <= self.y + self.h:
+                self.scroll(-event.y)
+        elif event.type == pygame.KEYDOWN:
+            if event.key == pygame.K_UP:
+                self.scroll(-1)
+            elif event.key == pygame.K_DOWN:
+                self.scroll(1)
+            elif event.key == pygame.K_PAGEUP:
+                self.scroll(-self.r)
+            elif event.key == pygame.K_PAGEDOWN:
+                self.scroll(self.r)
+            elif event.key == pygame.K_HOME:
+                self.scroll_to(0)
+            elif event.key == pygame.K_END:
+                self.scroll_to(self.item_count)
+        return self.offset != old
+
+    # return rect of the scroll bar (beside the menu), or of its track if track is True
+    def scroll_bar_rect(self, track=False):
+        x = self.x + self.w + 6
+        if track or self.item_count <= self.r:
+            return x, self.y, 8, self.h
+        h = max(20, self.h * self.r / self.item_count)
+        y = self.y + (self.h - h) * self.offset / (self.item_count - self.r)
+        return x, y, 8, h
+
+    def draw(self, win):
+        super().draw(win)
+        if self.visible and self.item_count > self.r:
+            pygame.draw.rect(win, self.bar_color, self.scroll_bar_rect(True), 1)
+            pygame.draw.rect(win, self.bar_color, self.scroll_bar_rect())
+
+    # return index of the item shown by a button
+    def get_button_ind(self, b):
+        return self.offset + self.button_list.find(b)
+
+    # return the item index of the button's row, given the button (items are in one column)
+    def get_button_pos(self, b):
+        return 0, self.get_button_ind(b)
+
+    # returns list of the indices of all clicked items
+    def get_clicked(self):
+        return [self.get_button_ind(b) for b in self.button_list.clicked if b.is_active()]
+
+    # returns list of the indices of all released items
+    def get_released(self):
+        return [self.get_button_ind(b) for b in self.button_list.released if b.is_active()]
+
+    # returns list of the indices of all hovered items
+    def get_hovered(self):
+        return [self.get_button_ind(b) for b in self.button_list.hovered if b.is_active()]
+
+    # return the button showing an item, None if the item is not in view
+    def get_item_button(self, ind):
+        if self.offset <= ind < self.offset + self.r:
+            return self.button_list.get(ind - self.offset)
+        return None
+
+
 # concrete word grid sub class of Grid
 class WordGrid(Grid):
     def __init__(self, rect, r, c, text_list, gap=0, visible_lines=True, text_hAlign=CENTER, text_vAlign=CENTER):
@@ -6,7 +6,10 @@
 # --------------------------------------------------------------------
 
 import pygame
-pygame.init()
+import dirty
+import fonts
+import glyphs
+import profiler
 
 # alignment constants
 LEFT = 0
@@ -25,28 +28,53 @@ class Label:
         self.color = color
         self.font = font
         self.size = size
+        self.generation = glyphs.get_generation()  # atlas generation the label was rendered in
         self.label = self.render_label()
         self.visible = visible
 
     def draw(self, win):
         if self.visible:
+            if self.generation != glyphs.get_generation():
+                self.label = self.render_label()  # theme changed, the rendered text was dropped
             win.blit(self.label, (self.x, self.y))
 
-    # return rendered label's text as a drawable
+    # return rendered label's text as a drawable (shared through the font cache, never drawn on)
+    # single characters are areas of the shared glyph atlas
+    @profiler.timed("Label.render_label")
     def render_label(self):
-        return pygame.font.SysFont(self.font, self.size).render(self.text, True, self.color)
+        self.generation = glyphs.get_generation()
+        if len(self.text) == 1:
+            return glyphs.get_atlas(self.font, self.size, self.color).glyph(self.text)
+        return fonts.render_text(self.text, self.font, self.size, self.color)
+
+    # marks the area covered by the label as changed (used by retained frames)
+    def mark_dirty(self):
+        if self.visible:
+            dirty.mark(self.get_rect())
 
     # --------------------SETTER AND GETTER METHODS--------------------
 
+    # returns rect tuple of the rendered text
+    def get_rect(self):
+        return self.x, self.y, self.label.get_width(), self.label.get_height()
+
     def set_x(self, x):
-        self.x = x
+        if x != self.x:
+            self.mark_dirty()
+            self.x = x
+            self.mark_dirty()
 
     def set_y(self, y):
-        self.y = y
+        if y != self.y:
+            self.mark_dirty()
+            self.y = y
+            self.mark_dirty()
 
     def set_size(self, size):
+        self.mark_dirty()
         self.size = size
         self.label = self.render_label()
+        self.mark_dirty()
 
     def get_width(self):
         return self.label.get_width()
@@ -55,15 +83,21 @@ class Label:
         return self.label.get_height()
 
     def set_text(self, text):
+        self.mark_dirty()
         self.text = text
         self.label = self.render_label()
+        self.mark_dirty()
 
     def set_color(self, color):
-        self.color = color
-        self.label = self.render_label()
+        if color != self.color:
+            self.color = color
+            self.label = self.render_label()
+            self.mark_dirty()
 
     def set_visible(self, b):
-        self.visible = b
+        if b != self.visible:
+            dirty.mark(self.get_rect())  # the area it is shown in, or was shown in before it was hidden
+            self.visible = b
 
 
 # sub class of label with a filled rectangular background
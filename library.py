@@ -0,0 +1,151 @@
+# --------------------------------------------------------------------
+# Program: Puzzle Library
+# Author: Alex Hyde
+# Date: Nov 23 2019
+# Description: Lazy reader for large puzzle files. The file is indexed
+#   once (byte offset and title of every puzzle), the index is saved
+#   in a sidecar file next to the puzzle file and reused until the
+#   puzzle file changes, and a puzzle is only parsed (from a memory
+#   mapped file) when it is asked for.
+# Input: Puzzle files in the same format read by
+#   puzzle.read_in_puzzles (or binary puzzle files through
+#   open_library).
+# --------------------------------------------------------------------
+
+import json
+import mmap
+import os
+
+import puzzle
+
+INDEX_VERSION = 1
+INDEX_SUFFIX = ".idx"
+
+
+# return a library for a puzzle file, either a binary puzzle file (binformat) or a puzzle text file
+def open_library(path):
+    import binformat
+
+    if binformat.is_binary_file(path):
+        return binformat.BinaryLibrary(path)
+    return PuzzleLibrary(path)
+
+
+# yield the puzzles of an open puzzle file one at a time, without keeping the earlier puzzles in memory
+def iter_puzzles(file):
+    for i in range(int(file.readline().strip())):
+        yield read_puzzle(file)
+
+
+# read one puzzle from a file (text or binary) positioned at the puzzle's title line
+def read_puzzle(file):
+    title = decode(file.readline()).strip()
+    rows = int(file.readline().strip())
+    cols = int(file.readline().strip())
+    ltrs = []
+    for r in range(rows):
+        ltrs += decode(file.readline()).split()
+    wordnum = int(file.readline().strip())
+    wrds = []
+    for w in range(wordnum):
+        wrds.append(decode(file.readline()).strip())
+    return puzzle.Puzzle(title, ltrs, wrds, cols, rows)
+
+
+# return line as a string (lines read from a memory mapped file are bytes)
+def decode(line):
+    if isinstance(line, bytes):
+        return line.decode("utf-8")
+    return line
+
+
+# library of puzzles in a puzzle file, parsed on demand
+class PuzzleLibrary:
+    def __init__(self, path, use_index_file=True):
+        self.path = path
+        self.index_path = path + INDEX_SUFFIX
+        self.use_index_file = use_index_file
+        self.file = open(path, "rb")
+        if os.path.getsize(path) > 0:
+            self.map = mmap.mmap(self.file.fileno(), 0, access=mmap.ACCESS_READ)
+        else:
+            self.map = None
+        self.offsets = []  # byte offset of each puzzle's title line
+        self.title_list = []
+        self.load_index()
+
+    # load the index from the sidecar file if it matches the puzzle file, otherwise build (and save) it
+    def load_index(self):
+        stat = os.stat(self.path)
+        key = [stat.st_mtime_ns, stat.st_size]
+        if self.use_index_file:
+            try:
+                with open(self.index_path, "r") as f:
+                    data = json.load(f)
+                if data.get("version") == INDEX_VERSION and data.get("key") == key:
+                    self.offsets = data["offsets"]
+                    self.title_list = data["titles"]
+                    return
+            except (OSError, ValueError, KeyError):
+                pass  # missing or unreadable index, build a new one
+
+        self.build_index()
+        if self.use_index_file:
+            try:
+                with open(self.index_path, "w") as f:
+                    json.dump({"version": INDEX_VERSION, "key": key, "offsets": self.offsets,
+                               "titles": self.title_list}, f)
+            except OSError:
+                pass  # the library still works without a saved index (e.g. read only folder)
+
+    # find the offset and title of every puzzle by skipping through the file
+    def build_index(self):
+        self.offsets = []
+        self.title_list = []
+        if self.map is None:
+            return
+        m = self.map
+        m.seek(0)
+        for i in range(int(m.readline().strip())):
+            self.offsets.append(m.tell())
+            self.title_list.append(decode(m.readline()).strip())
+            rows = int(m.readline().strip())
+            m.readline()  # columns
+            for r in range(rows):
+                m.readline()
+            for w in range(int(m.readline().strip())):
+                m.readline()
+
+    # return list of every puzzle title (from the index, no puzzle is parsed)
+    def titles(self):
+        return list(self.title_list)
+
+    def get_title(self, ind):
+        return self.title_list[ind]
+
+    # return a puzzle, parsed from the file when it is asked for
+    def get(self, ind):
+        self.map.seek(self.offsets[ind])
+        return read_puzzle(self.map)
+
+    def close(self):
+        if self.map is not None:
+            self.map.close()
+        self.file.close()
+
+    def __getitem__(self, ind):
+        return self.get(ind)
+
+    def __len__(self):
+        return len(self.offsets)
+
+    # yields every puzzle in order, one at a time
+    def __iter__(self):
+        for i in range(len(self.offsets)):
+            yield self.get(i)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *args):
+        self.close()
@@ -0,0 +1,56 @@
+# --------------------------------------------------------------------
+# Program: Line Table
+# Author: Alex Hyde
+# Date: Nov 28 2019
+# Description: Per puzzle lookup tables for selecting words. Any two
+#   cells on a straight or diagonal line map to the cells between them
+#   (worked out from a step table, no cells are visited), and every
+#   placement of every word (from either end) maps to the word, so a
+#   drag is turned into cells and checked with single lookups. The
+#   table is read only, so games of the same puzzle can share it.
+# --------------------------------------------------------------------
+
+import solver
+
+
+# line and word lookup for one puzzle grid
+class LineTable:
+    def __init__(self, r, c, placements=(), words=()):
+        self.r = r
+        self.c = c
+        self.word_set = frozenset(words)  # words of the puzzle
+        # (sign of dx, sign of dy) -> index step between neighbouring cells in that direction
+        self.steps = {(dx, dy): dy * c + dx for dx, dy in solver.DIRECTIONS}
+        self.steps[(0, 0)] = 1  # a line from a cell to itself
+        self.words = {}  # (end cell index, end cell index) -> word placed between the cells
+        for p in placements:
+            self.add_word(p)
+
+    # add a word placement (solver.Placement), found from either end
+    def add_word(self, p):
+        start = p.start[1] * self.c + p.start[0]
+        end = p.end[1] * self.c + p.end[0]
+        self.words.setdefault((start, end), p.word)
+        self.words.setdefault((end, start), p.word)
+
+    # return range of cell indices from one cell to another (both included), None if they are not on a line
+    def line(self, start, end):
+        if not (0 <= start < self.r * self.c and 0 <= end < self.r * self.c):
+            return None
+        sx, sy = start % self.c, start // self.c
+        ex, ey = end % self.c, end // self.c
+        dx, dy = ex - sx, ey - sy
+        if dx != 0 and dy != 0 and abs(dx) != abs(dy):  # not vertical, horizontal or perfectly diagonal
+            return None
+        step = self.steps[((dx > 0) - (dx < 0), (dy > 0) - (dy < 0))]
+        return range(start, end + step, step)
+
+    # return the word placed from one cell to the other (in either direction), None if there isn't one
+    def word_at(self, start, end):
+        return self.words.get((start, end))
+
+
+# return a line table for a puzzle, with every word placement found by the solver
+def build(puzzle):
+    placements = [p for ps in solver.find_words(puzzle).values() for p in ps]
+    return LineTable(puzzle.r, puzzle.c, placements, puzzle.words)
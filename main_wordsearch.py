@@ -9,21 +9,35 @@
 #   draging to select words. The program allows free movement between
 #   any word search puzzle and the puzzle select screen.
 # Input: The program takes input from the user through button clicks.
+#   python main_wordsearch.py --profile frames.csv saves profiled
+#   frames (F3 shows the profiler overlay).
 # --------------------------------------------------------------------
 
+import sys
+import threading
 import pygame
 import vector
 import label
 import random
 import grid
 import frame
-
-pygame.init()
+import board
+import engine
+import linetable
+import boardcache
+import pointer
+import preview
+import profiler
+import scheduler
+import library
+from puzzle import Puzzle, read_in_puzzles
 
 # window screen constants
 WIN_WIDTH = 800
 WIN_HEIGHT = 700
-WIN = pygame.display.set_mode((WIN_WIDTH, WIN_HEIGHT))
+
+# number of puzzle titles shown at once on the puzzle select screen
+PUZZLE_ROWS = 6
 
 # colours
 WHITE = (255, 255, 255)
@@ -43,30 +57,42 @@ ORANGE = (255, 150, 0)
 DARK_ORANGE = (200, 100, 0)
 
 
-# main word search class for gameplay
-class WordSearch(grid.Menu):
-    def __init__(self, rect, puzzle, gap=0, hColor=RED, color=BLACK, fColor=WHITE):
-        super().__init__(rect, puzzle.r, puzzle.c, puzzle.letters, gap, on_button_click,
-                         color=color, visible_lines=False)
+# main word search class for gameplay, a view of a game state (engine.GameState)
+# the letter cells are drawn by the board (the "buttons" of the word search are cell indices)
+class WordSearch(board.Board):
+    def __init__(self, rect, puzzle, gap=0, hColor=RED, color=BLACK, fColor=WHITE, snap_to_grid=True, game=None):
+        super().__init__(rect, puzzle.r, puzzle.c, puzzle.letters, gap, self.on_cell_click, color=color,
+                         visible_lines=False, fColor=fColor, bColor=color, onHoldColor=hColor, onHoverColor=hColor)
+        # found words and the cells they use are kept by the game state
+        self.game = game if game is not None else engine.GameState(puzzle)
         self.title = puzzle.get_title()  # title from puzzle object
         self.highlight_color = hColor
+        self.fColor = fColor
         self.first_click = None  # button at first click of drag
         self.second_click = None  # mousepos of drag
         self.word_list = puzzle.words
         self.start_pos = None  # mouse position at frist click of drag
-        self.current_highlight_buttons = []
-        self.used_buttons = []  # buttons used in found words
+        # drags are resolved in whole cells (get_drag_cell), False uses the angle of the drag in pixels instead
+        self.snap_to_grid = snap_to_grid
+        self.last_drag = None  # (mouse position, first click) the highlight was last worked out for
+        self.current_highlight_buttons = set()
         self.word_grid = self.create_word_labels()
         self.rendered_title = grid.WordGrid((self.x, self.y - 70, self.w, 50), 1, 1,
                                             text_list=[self.title + " Word Search!"], visible_lines=False)
         self.rendered_title.labels[0].set_size(40)  # sets title size
         self.rendered_title.update_labels_pos()  # update title pos to center of grid
-        self.found_words = 0
-        for b in self.button_list:  # sets button colours
-            b.set_fColor(fColor)
-            b.set_bColor(color)
-            b.set_hoverColor(hColor)
-            b.set_holdColor(hColor)
+        # starting colours of the word list and title labels (put back by reset)
+        self.label_colors = [l.color for l in self.word_grid.labels + self.rendered_title.labels]
+
+    # number of words found
+    @property
+    def found_words(self):
+        return self.game.found_words
+
+    # buttons used in found words
+    @property
+    def used_buttons(self):
+        return self.game.used_cells
 
     def draw(self, win):
         super().draw(win)
@@ -83,256 +109,309 @@ class WordSearch(grid.Menu):
 
     # get list of buttons from button to another button (only in straight or perfectly diagonal lines)
     def get_b_list(self):
-        b_list = []
-        if self.first_click[0] == self.second_click[0]:  # if vertical
-            if self.first_click[1] < self.second_click[1]:
-                start = self.first_click[1]
-            else:
-                start = self.second_click[1]
-            for l in range(abs(self.first_click[1] - self.second_click[1])+1):
-                b_list.append(self.get_button_by_pos(self.first_click[0], start + l))
-
-        elif self.first_click[1] == self.second_click[1]:  # if horizontal
-            if self.first_click[0] < self.second_click[0]:
-                start = self.first_click[0]
-            else:
-                start = self.second_click[0]
-            for l in range(abs(self.first_click[0] - self.second_click[0])+1):
-                b_list.append(self.get_button_by_pos(start + l, self.first_click[1]))
-
-        # if diagonal
-        elif abs(self.first_click[0] - self.second_click[0]) == abs(self.first_click[1] - self.second_click[1]):
-
-            # starts from left most button. Sign determines if the slope if up or down
-            if self.first_click[0] < self.second_click[0]:
-                start = self.first_click
-                if self.first_click[1] - self.second_click[1] < 0:
-                    sign = 1
-                else:
-                    sign = -1
-            else:
-                start = self.second_click
-                if self.second_click[1] - self.first_click[1] < 0:
-                    sign = 1
-                else:
-                    sign = -1
-            for l in range(abs(self.first_click[0] - self.second_click[0])+1):
-                b_list.append(self.get_button_by_pos(start[0] + l, start[1] + l * sign))
-
-        return b_list
+        return self.game.get_line(self.get_button_by_pos(*self.first_click),
+                                  self.get_button_by_pos(*self.second_click))
 
-    # checks if the buttons in the button list for a word in the word search's word list
+    # select the buttons from the first click to the end of the drag, colouring the word if one was found
+    # returns the result of the selection (engine.SelectResult)
     def check_word(self, b_list):
-        string = ""
-        for b in b_list:
-            string += b.get_text()
-
-        if string in self.word_list:
-            self.word_grid.get_label(string).set_color(ORANGE)
-            for b in b_list:
-                b.set_fColor(GREY)
-                self.used_buttons.append(b)
-            self.found_words += 1
-        elif string[::-1] in self.word_list:  # backwards
-            self.word_grid.get_label(string[::-1]).set_color(ORANGE)
-            for b in b_list:
-                b.set_fColor(GREY)
-                self.used_buttons.append(b)
-            self.found_words += 1
-
-        # check if the puzzle is complete
-        if self.found_words == len(self.word_list):
-            winLabel.set_visible(True)
-            winLabel2.set_visible(True)
-            current_word_search.button_list.set_active(False)
-            current_frame.fill = LIGHT_GREEN
+        if len(b_list) > 0:
+            result = self.game.select(b_list[0], b_list[-1])
+        else:
+            result = engine.SelectResult(b_list, complete=self.game.is_complete())
+
+        if result.word is not None:
+            self.word_grid.get_label(result.word).set_color(ORANGE)
+            for b in result.cells:
+                self.set_fill(b, GREY)
+
+        # if the puzzle is complete (the window around the word search is changed by the caller)
+        if result.complete:
+            self.set_active(False)
             for word in self.word_grid.labels:
                 word.set_color(PURPLE)
             self.rendered_title.get_label_by_index(0).set_color(PURPLE)
+        return result
 
     # highlights buttons from start click to current mouse position (only gets buttons in valid directions)
-    def highlight_buttons(self):
-        mousepos = pygame.mouse.get_pos()
+    # (mousepos can be given instead of reading the mouse, e.g. for scripted drags)
+    @profiler.timed("WordSearch.highlight_buttons")
+    def highlight_buttons(self, mousepos=None):
+        if mousepos is None:
+            mousepos = pygame.mouse.get_pos()
         if self.first_click is not None:
-            angle = vector.Vec2(self.start_pos[0], self.start_pos[1]).angle(vector.Vec2(mousepos[0], mousepos[1]))
-
-            if 90-22.5 <= angle < 90+22.5 or 270-22.5 <= angle < 270+22.5:  # vertical
-                end_button = self.button_list.get_button_at((self.start_pos[0], mousepos[1]))
-
-            elif 180-22.5 <= angle < 180+22.5 or 360 - 22.5 <= angle or angle < 22.5:  # horizontal
-                end_button = self.button_list.get_button_at((mousepos[0], self.start_pos[1]))
-
-            elif 135-22.5 <= angle < 135+22.5 or 315 - 22.5 <= angle < 315 + 22.5:  # diagonal (bottom left/top right)
-                pos = vector.Vec2.closest_point(vector.Vec2(self.start_pos[0], self.start_pos[1]),
-                                                vector.Vec2(self.start_pos[0] - 1, self.start_pos[1] + 1),
-                                                vector.Vec2(mousepos[0], mousepos[1]))
-                end_button = self.button_list.get_button_at((pos.x, pos.y))
-
-            elif 45-22.5 <= angle < 45+22.5 or 225 - 22.5 <= angle < 225 + 22.5:  # diagonal (top left/bottom right)
-                pos = vector.Vec2.closest_point(vector.Vec2(self.start_pos[0], self.start_pos[1]),
-                                                vector.Vec2(self.start_pos[0] + 1, self.start_pos[1] + 1),
-                                                vector.Vec2(mousepos[0], mousepos[1]))
-                end_button = self.button_list.get_button_at((pos.x, pos.y))
-            else:  # if mouse if on top of the start click
-                end_button = -1
+            if (mousepos, self.first_click) == self.last_drag:  # the mouse hasn't moved since the last highlight
+                return
+            self.last_drag = (mousepos, self.first_click)
+            if self.snap_to_grid:
+                end_button = self.get_drag_cell(self.get_button_by_pos(*self.first_click), mousepos)
+            else:
+                end_button = self.get_drag_button_geometric(mousepos)
 
-            if end_button != -1:  # if a second button was gotten
+            # if a second button was gotten (nothing changes while the drag stays on the same button)
+            if end_button != -1 and self.get_button_pos(end_button) != self.second_click:
                 self.second_click = self.get_button_pos(end_button)
-                temp_b_list = self.get_b_list()
-                self.unhighlight_buttons()
-                self.current_highlight_buttons = temp_b_list
-                for b in temp_b_list:
-                    b.set_fColor(self.highlight_color)
+                self.set_highlight(self.get_b_list())
+
+    # return button at the end of a drag from the angle between the first click and the mouse position
+    # (for layouts where the buttons are not evenly spaced), -1 if the mouse is not over a button
+    def get_drag_button_geometric(self, mousepos):
+        angle = vector.Vec2(self.start_pos[0], self.start_pos[1]).angle(vector.Vec2(mousepos[0], mousepos[1]))
+
+        if 90-22.5 <= angle < 90+22.5 or 270-22.5 <= angle < 270+22.5:  # vertical
+            return self.get_cell_at((self.start_pos[0], mousepos[1]))
+
+        elif 180-22.5 <= angle < 180+22.5 or 360 - 22.5 <= angle or angle < 22.5:  # horizontal
+            return self.get_cell_at((mousepos[0], self.start_pos[1]))
+
+        elif 135-22.5 <= angle < 135+22.5 or 315 - 22.5 <= angle < 315 + 22.5:  # diagonal (bottom left/top right)
+            pos = vector.Vec2.closest_point(vector.Vec2(self.start_pos[0], self.start_pos[1]),
+                                            vector.Vec2(self.start_pos[0] - 1, self.start_pos[1] + 1),
+                                            vector.Vec2(mousepos[0], mousepos[1]))
+            return self.get_cell_at((pos.x, pos.y))
+
+        elif 45-22.5 <= angle < 45+22.5 or 225 - 22.5 <= angle < 225 + 22.5:  # diagonal (top left/bottom right)
+            pos = vector.Vec2.closest_point(vector.Vec2(self.start_pos[0], self.start_pos[1]),
+                                            vector.Vec2(self.start_pos[0] + 1, self.start_pos[1] + 1),
+                                            vector.Vec2(mousepos[0], mousepos[1]))
+            return self.get_cell_at((pos.x, pos.y))
+        return -1  # if mouse if on top of the start click
+
+    # highlight a set of buttons, only recolouring the buttons added to or removed from the last highlight
+    def set_highlight(self, buttons):
+        buttons = set(buttons)
+        for b in self.current_highlight_buttons - buttons:
+            if b not in self.used_buttons:
+                self.set_fill(b, WHITE)
+            else:
+                self.set_fill(b, (200, 200, 200))
+        for b in buttons - self.current_highlight_buttons:
+            self.set_fill(b, self.highlight_color)
+        self.current_highlight_buttons = buttons
 
     # reset all buttons that shouldn't be highlighted
     def unhighlight_buttons(self):
-        for b in self.current_highlight_buttons:
-            if b not in self.used_buttons:
-                b.set_fColor(WHITE)
-            else:
-                b.set_fColor((200, 200, 200))
-
-
-# puzzle class for storing puzzle info (used as argument in word search class)
-class Puzzle:
-    def __init__(self, title, ltrs, wrds, c, r):
-        self.title = title
-        self.words = wrds
-        self.letters = ltrs
-        self.c = c
-        self.r = r
-
-    def get_title(self):
-        return self.title
-
-
-# create a list of puzzle objects storing the puzzles read in from the puzzle file
-def read_in_puzzles(file):
-    pz = []
-    for i in range(int(file.readline().strip())):
-        title = file.readline().strip()
-        rows = int(file.readline().strip())
-        cols = int(file.readline().strip())
-        ltrs = ""
-        for r in range(rows):
-            ltrs += file.readline().strip() + " "
-        ltrs = ltrs.split()
-        wordnum = int(file.readline().strip())
-        wrds = []
-        for w in range(wordnum):
-            wrds.append(file.readline().strip())
-        pz.append(Puzzle(title, ltrs, wrds, rows, cols))
-    return pz
-
-
-# function run when any word search button is clicked
-def on_button_click(b):
-    ws = current_word_search
-    if ws.first_click is None:
-        ws.first_click = ws.get_button_pos(b)
-        ws.start_pos = pygame.mouse.get_pos()
-
-
-def redraw():
-    current_frame.draw(WIN)
-    pygame.display.update()
-
-
-# read in puzzles from text file
-puzzles = read_in_puzzles(open("puzzles.txt", "r"))
-current_word_search = None  # initializes variable
-
-# puzzle select screen
-puzzle_select = grid.Menu((150, 100, 500, 500), len(puzzles), 1, [p.get_title() for p in puzzles], gap=10)
-for but in puzzle_select.button_list:  # set button attributes
-    but.rendered_text.set_size(40)
-    but.reset_text_pos()
-    but.set_hoverColor(ORANGE)
-    but.set_holdColor(DARK_ORANGE)
-# title label
-super_cool_label = label.Label("SUPER COOL WORD SEARCH!", y=30)
-super_cool_label.set_size(50)
-super_cool_label.set_x((WIN_WIDTH - super_cool_label.get_width())/2)
-super_cool_label.set_color(BLACK)
-
-# frame displayed on puzzle select (title screen)
-puzzle_select_frame = frame.Frame([puzzle_select, super_cool_label], [puzzle_select.button_list], fill=THE_BLUE)
-
-# labels displayed when a puzzle is complete
-winLabel = label.FilledLabel((200, 300, 400, 80), "TA-DA!!!", border=3)
-winLabel.set_size(50)
-winLabel.fColor = GREEN
-winLabel.update_text_pos()
-winLabel2 = label.FilledLabel((220, 400, 360, 60), "Press anywhere to continue", border=3)
-winLabel2.set_size(25)
-winLabel2.fColor = THE_BLUE
-winLabel2.update_text_pos()
-
-# frame displayed on screen (starts with puzzle select)
-current_frame = puzzle_select_frame
-
-inPlay = True
-clock = pygame.time.Clock()
-
-
-while inPlay:
-    redraw()
-    clock.tick(60)
-
-    events = pygame.event.get()
-
-    # booleans used for button click processing
-    mouse_click = False
-    mouse_release = False
-
-    for event in events:
-        if event.type == pygame.QUIT:
-            inPlay = False
-
-        elif event.type == pygame.MOUSEBUTTONDOWN:
-            if event.button == 1:  # prevent scrolling on buttons (left or right click only)
-                mouse_click = True
-
-        elif event.type == pygame.MOUSEBUTTONUP:
-            if event.button == 1:
-                mouse_release = True
-                # if a puzzle is complete, press anywhere to return to the puzzle screen
-                if winLabel.visible and current_frame != puzzle_select_frame:
+        self.set_highlight(())
+        self.last_drag = None
+
+    # return the word search to the start of a new game, recolouring only the cells and labels that changed
+    def reset(self):
+        self.set_highlight(())
+        for b in self.game.used_cells:
+            self.set_fill(b, self.fColor)
+        for b in list(self.clicked_cells):  # cells held down when the game was left
+            self.clicked_cells.discard(b)
+            self.set_current_color(b, self.fill[b])
+        self.game.reset()
+        for l, color in zip(self.word_grid.labels + self.rendered_title.labels, self.label_colors):
+            l.set_color(color)
+        self.first_click = None
+        self.second_click = None
+        self.start_pos = None
+        self.last_drag = None
+        self.set_active(True)
+
+    # function run when any word search button is clicked
+    def on_cell_click(self, b):
+        if self.first_click is None:
+            self.first_click = self.get_button_pos(b)
+            self.start_pos = pygame.mouse.get_pos()
+
+
+# draws a frame (and the profiler overlay on top of it), only updating the parts of the window that changed
+def redraw(win, current_frame, overlay=None):
+    rects = current_frame.redraw(win)
+    if overlay is not None:
+        overlay_rect = overlay.draw(win)
+        if overlay_rect is not None:
+            rects = rects + [overlay_rect]
+    if rects:
+        pygame.display.update(rects)
+
+
+# return the puzzle select menu and the frame showing it (the title screen)
+def create_puzzle_select(puzzles):
+    # puzzle select screen (scrollable, only the titles in view are rendered)
+    puzzle_select = grid.ScrollMenu((150, 100, 500, 500), PUZZLE_ROWS, len(puzzles), puzzles.get_title, gap=10,
+                                    text_size=40)
+    for but in puzzle_select.button_list:  # set button attributes
+        but.set_hoverColor(ORANGE)
+        but.set_holdColor(DARK_ORANGE)
+    # title label
+    super_cool_label = label.Label("SUPER COOL WORD SEARCH!", y=30)
+    super_cool_label.set_size(50)
+    super_cool_label.set_x((WIN_WIDTH - super_cool_label.get_width())/2)
+    super_cool_label.set_color(BLACK)
+
+    # frame displayed on puzzle select (title screen)
+    puzzle_select_frame = frame.Frame([puzzle_select, super_cool_label], [puzzle_select.button_list], fill=THE_BLUE,
+                                      retained=True)
+    return puzzle_select, puzzle_select_frame
+
+
+# open the window and run the game until it is closed
+# with a profile path, profiling is on from the start and the last frames are saved to the path every few seconds
+def main(profile_path=None):
+    # only the parts of pygame the game uses are started (fonts are also started by the font cache when needed)
+    pygame.display.init()
+    pygame.font.init()
+    win = pygame.display.set_mode((WIN_WIDTH, WIN_HEIGHT))
+
+    # index puzzles in text file (each puzzle is only read when it is selected)
+    puzzles = library.open_library("puzzles.txt")
+    current_word_search = None  # initializes variable
+
+    # the library reads from one file, so puzzles are read by one thread at a time (the main thread, and the board
+    # cache's worker thread loading the puzzle under the mouse)
+    puzzle_lock = threading.Lock()
+
+    def read_puzzle(ind):
+        with puzzle_lock:
+            return puzzles[ind]
+
+    puzzle_select, puzzle_select_frame = create_puzzle_select(puzzles)
+    # previews of the puzzles beside their titles, made a few per frame while the puzzle select screen is shown
+    previews = preview.PreviewColumn(puzzle_select,
+                                     preview.PreviewCache(read_puzzle, preview.default_preview_folder()))
+    puzzle_select_frame.add(previews)
+
+    # labels displayed when a puzzle is complete
+    winLabel = label.FilledLabel((200, 300, 400, 80), "TA-DA!!!", border=3)
+    winLabel.set_size(50)
+    winLabel.fColor = GREEN
+    winLabel.update_text_pos()
+    winLabel2 = label.FilledLabel((220, 400, 360, 60), "Press anywhere to continue", border=3)
+    winLabel2.set_size(25)
+    winLabel2.fColor = THE_BLUE
+    winLabel2.update_text_pos()
+
+    # played word searches are kept (and reset when played again)
+    def load_board(ind):
+        p = read_puzzle(ind)  # reads the puzzle from the file
+        return p, linetable.build(p)
+
+    def build_board(ind, data):
+        p, lines = data
+        ws = WordSearch((100, 100, 500, 500), p, gap=2, hColor=ORANGE, game=engine.GameState(p, lines))
+        # frame with word search (and win labels, currently invisible)
+        return ws, frame.Frame([ws, winLabel, winLabel2], [ws], THE_BLUE, retained=True)
+
+    def reset_board(board):
+        ws, game_frame = board
+        ws.reset()
+        game_frame.set_fill(THE_BLUE)
+
+    # the puzzle under the mouse is loaded in the background, its word search is only built once it is played
+    boards = boardcache.BoardCache(load_board, build_board, reset_board)
+
+    # frame displayed on screen (starts with puzzle select)
+    current_frame = puzzle_select_frame
+
+    inPlay = True
+    # runs frames at a fixed rate during drags, otherwise sleeps until there is an event
+    frame_scheduler = scheduler.Scheduler()
+    pointer_state = pointer.PointerState()  # used to skip processing buttons when nothing changed
+
+    # profiler overlay (toggled with F3) and dumps of the profiled frames
+    overlay = profiler.Overlay()
+    dumper = None
+    if profile_path is not None:
+        profiler.enable(True)
+        dumper = profiler.Dumper(profile_path)
+
+    while inPlay:
+        redraw(win, current_frame, overlay)
+        events = pointer.coalesce(frame_scheduler.get_events())  # only the latest mouse motion is needed
+
+        # booleans used for button click processing
+        mouse_click = False
+        mouse_release = False
+
+        for event in events:
+            if event.type == pygame.QUIT:
+                inPlay = False
+
+            elif event.type == pygame.MOUSEBUTTONDOWN:
+                if event.button == 1:  # prevent scrolling on buttons (left or right click only)
+                    mouse_click = True
+
+            elif event.type == pygame.MOUSEBUTTONUP:
+                if event.button == 1:
+                    mouse_release = True
+                    # if a puzzle is complete, press anywhere to return to the puzzle screen
+                    if winLabel.visible and current_frame != puzzle_select_frame:
+                        current_frame = puzzle_select_frame
+                    if current_word_search is not None:
+                        # when you release, check if a word is highlighted and reset the highlight and click variables
+                        if current_word_search.second_click is not None:
+                            result = current_word_search.check_word(current_word_search.get_b_list())
+                            if result.complete:  # show the win screen
+                                winLabel.set_visible(True)
+                                winLabel2.set_visible(True)
+                                current_frame.set_fill(LIGHT_GREEN)
+                        current_word_search.unhighlight_buttons()
+                        current_word_search.first_click = None
+                        current_word_search.second_click = None
+
+            elif event.type == pygame.MOUSEWHEEL:
+                if current_frame == puzzle_select_frame:
+                    puzzle_select.process_scroll(event)
+
+            elif event.type == pygame.KEYDOWN:
+                if current_frame == puzzle_select_frame:
+                    puzzle_select.process_scroll(event)
+                if event.key == pygame.K_ESCAPE:
+                    # return to puzzle select screen
+                    current_word_search = None
                     current_frame = puzzle_select_frame
-                if current_word_search is not None:
-                    # when you release, check if a word is highlighted and reset the highlight and click variables
-                    if current_word_search.second_click is not None:
-                        current_word_search.check_word(current_word_search.get_b_list())
-                    current_word_search.unhighlight_buttons()
-                    current_word_search.first_click = None
-                    current_word_search.second_click = None
-
-        elif event.type == pygame.KEYDOWN:
-            if event.key == pygame.K_ESCAPE:
-                # return to puzzle select screen
-                current_word_search = None
-                current_frame = puzzle_select_frame
-
-    # if draging a word, button below mouse if not highlighted (mousepos is adjusted to the last button in the line)
-    if current_word_search is not None and current_word_search.second_click is not None:
-        mp = current_word_search.second_click
+                elif event.key == pygame.K_F3:
+                    overlay.toggle()
+
+        # if draging a word, button below mouse if not highlighted (mousepos is adjusted to the last button in the line)
+        if current_word_search is not None and current_word_search.second_click is not None:
+            mp = current_word_search.second_click
+        else:
+            mp = pygame.mouse.get_pos()
+        # skipped when the mouse only moved within the same button or cell as last frame
+        if pointer_state.needs_processing(current_frame, mp, pointer.only_motion(events)):
+            current_frame.process_events(mouse_click, mouse_release, mp)
+
+        # process puzzle select button on release
+        previews_pending = False
+        if current_frame == puzzle_select_frame:
+            previews_pending = previews.update()
+            for but in puzzle_select.get_released():
+                # switches to game frame from puzzle select frame (a new word search, or a cached one reset)
+                current_word_search, current_frame = boards.get(but)
+                winLabel.set_visible(False)
+                winLabel2.set_visible(False)
+            # load the puzzle under the mouse in the background, it is likely to be played next
+            hovered = puzzle_select.get_hovered()
+            if current_frame == puzzle_select_frame and hovered:
+                boards.preload(hovered[0])
+        elif current_word_search is not None:
+            current_word_search.highlight_buttons()
+
+        # only drags (the held mouse button isn't sent as events) and previews still being made need the fixed
+        # rate loop
+        frame_scheduler.set_active(pygame.mouse.get_pressed()[0] or previews_pending)
+
+        profiler.end_frame()
+        if dumper is not None:
+            dumper.update()
+
+    print("Time " + frame_scheduler.report())
+    if dumper is not None:
+        profiler.dump(profile_path)
+
+    # always quit pygame :)
+    boards.close()
+    pygame.quit()
+    puzzles.close()
+
+
+if __name__ == "__main__":
+    if len(sys.argv) == 3 and sys.argv[1] == "--profile":
+        main(sys.argv[2])
     else:
-        mp = pygame.mouse.get_pos()
-    current_frame.process_events(mouse_click, mouse_release, mp)
-
-    # process puzzle select button on release
-    if current_frame == puzzle_select_frame:
-        for but in puzzle_select.get_released():
-            p = puzzles[but]
-            current_word_search = WordSearch((100, 100, 500, 500), p, gap=2, hColor=ORANGE)  # create new word search
-            winLabel.set_visible(False)
-            winLabel2.set_visible(False)
-            # switches to game frame from puzzle select frame
-            # creates frame with word search (and win labels, currently invisible)
-            current_frame = frame.Frame([current_word_search, winLabel, winLabel2],
-                                        [current_word_search.button_list], THE_BLUE)
-    elif current_word_search is not None:
-        current_word_search.highlight_buttons()
-
-# always quit pygame :)
-pygame.quit()
+        main()
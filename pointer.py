@@ -0,0 +1,55 @@
+# --------------------------------------------------------------------
+# Program: Pointer Input
+# Author: Alex Hyde
+# Date: Nov 29 2019
+# Description: Cuts down the work done for mouse movement. Queued
+#   mouse motion events are merged into the latest one, and a frame's
+#   button processing is skipped when the mouse is over the same
+#   button or cell as last frame and nothing else happened.
+# Input: The events of a frame, and the frame with the mouse position
+#   its buttons are processed with.
+# --------------------------------------------------------------------
+
+import pygame
+
+
+# return events with every mouse motion event but the last one removed (the last one has the latest position)
+def coalesce(events):
+    last = -1
+    for i, event in enumerate(events):
+        if event.type == pygame.MOUSEMOTION:
+            last = i
+    return [event for i, event in enumerate(events) if event.type != pygame.MOUSEMOTION or i == last]
+
+
+# return if events only moved the mouse (no clicks, keys or anything else that can change the buttons)
+def only_motion(events):
+    for event in events:
+        if event.type != pygame.MOUSEMOTION:
+            return False
+    return True
+
+
+# remembers what a frame's buttons were last processed with
+class PointerState:
+    def __init__(self):
+        self.last = None  # (frame, hover key) of the last frame processed without clicks or other events
+        self.processed = 0
+        self.skipped = 0
+
+    # return if a frame's buttons have to be processed, they don't if the last frame was processed in the same
+    # frame with the same hover key and this frame only moved the mouse (quiet is False for clicks and other events)
+    def needs_processing(self, current_frame, mousepos, quiet):
+        key = (current_frame, current_frame.get_hover_key(mousepos))
+        if quiet and key == self.last:
+            self.skipped += 1
+            return False
+        # a frame with clicks or other events leaves the buttons in a different state than hovering does,
+        # so the frame after it is always processed
+        self.last = key if quiet else None
+        self.processed += 1
+        return True
+
+    # make the next frame be processed
+    def reset(self):
+        self.last = None
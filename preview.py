@@ -0,0 +1,200 @@
+# --------------------------------------------------------------------
+# Program: Puzzle Previews
+# Author: Alex Hyde
+# Date: Dec 06 2019
+# Description: Small pictures of each puzzle's board for the puzzle
+#   select screen. A board is drawn offscreen with Frame.get_screen and
+#   scaled down, then saved as a PNG named by a hash of what is drawn,
+#   so a puzzle is only rendered again when its letters change.
+#   Previews are made a few at a time between frames (only for the rows
+#   in view and the pages next to them) and the ones in memory are
+#   limited to the most recently shown.
+# Input: Function returning a puzzle given its index, and the scroll
+#   menu the previews are shown beside.
+# --------------------------------------------------------------------
+
+import hashlib
+import json
+import os
+import time
+from collections import OrderedDict
+
+import pygame
+import board
+import dirty
+import frame
+
+PREVIEW_VERSION = 2  # changing how previews are drawn should change this, so old cached files aren't used
+THUMB_SIZE = 64  # width and height of a preview
+RENDER_SIZE = 320  # the board is drawn at this size and scaled down
+TEXT_SIZE = 14  # size of the letters on every preview, so they all share one glyph atlas
+MAX_PREVIEWS = 128  # previews kept in memory
+FRAME_BUDGET = 0.008  # seconds of preview work per frame (at least one preview is made each update)
+
+# colours
+WHITE = (255, 255, 255)
+BLACK = (0, 0, 0)
+GREY = (170, 170, 170)
+
+
+# return the default folder of cached previews (in the user's cache folder)
+def default_preview_folder():
+    folder = os.environ.get("XDG_CACHE_HOME") or os.path.join(os.path.expanduser("~"), ".cache")
+    return os.path.join(folder, "wordsearch", "previews")
+
+
+# return hash of everything a preview of a puzzle depends on
+def content_hash(p, size=THUMB_SIZE):
+    data = json.dumps([PREVIEW_VERSION, size, RENDER_SIZE, p.r, p.c, p.letters])
+    return hashlib.sha1(data.encode("utf-8")).hexdigest()
+
+
+# return surface with a preview of a puzzle's board
+def render_preview(p, size=THUMB_SIZE):
+    cell = RENDER_SIZE / max(p.r, p.c)
+    # cells too small for a border are drawn without one, and cells too small for a letter are left blank
+    letters = p.letters if cell >= TEXT_SIZE else [" "] * len(p.letters)
+    b = board.Board((0, 0, RENDER_SIZE, RENDER_SIZE), p.r, p.c, letters, visible_lines=False,
+                    bColor=BLACK if cell >= 6 else None, text_size=TEXT_SIZE)
+    screen = frame.Frame([b], fill=WHITE).get_screen(RENDER_SIZE + 1, RENDER_SIZE + 1)
+    return pygame.transform.smoothscale(screen, (size, size))
+
+
+# previews of the puzzles of a library, loaded from the cache folder or rendered when they aren't in it
+class PreviewCache:
+    def __init__(self, read_puzzle, folder=None, size=THUMB_SIZE, capacity=MAX_PREVIEWS):
+        self.read_puzzle = read_puzzle  # puzzle index -> puzzle
+        self.folder = folder  # folder of cached previews (None keeps them in memory only)
+        self.size = size
+        self.capacity = capacity
+        self.previews = OrderedDict()  # puzzle index -> surface, least recently used first
+        self.rendered = 0
+        self.loaded = 0  # previews read from the cache folder
+
+    # return the preview of a puzzle, None if it hasn't been made
+    def get(self, ind):
+        surf = self.previews.get(ind)
+        if surf is not None:
+            self.previews.move_to_end(ind)
+        return surf
+
+    def __contains__(self, ind):
+        return ind in self.previews
+
+    # return the path of a cached preview
+    def get_path(self, key):
+        return os.path.join(self.folder, key + ".png")
+
+    # make the preview of a puzzle (read from the cache folder if it is there)
+    def make(self, ind):
+        p = self.read_puzzle(ind)
+        surf = None
+        path = None
+        if self.folder is not None:
+            path = self.get_path(content_hash(p, self.size))
+            try:
+                surf = pygame.image.load(path)
+                if surf.get_size() != (self.size, self.size):
+                    surf = None
+                else:
+                    self.loaded += 1
+            except (OSError, pygame.error):
+                surf = None  # not cached (or the file is unreadable), it is rendered again
+        if surf is None:
+            surf = render_preview(p, self.size)
+            self.rendered += 1
+            if path is not None:
+                self.save(surf, path)
+        if pygame.display.get_surface() is not None:
+            surf = surf.convert()
+        self.previews[ind] = surf
+        while len(self.previews) > self.capacity:
+            self.previews.popitem(last=False)
+        return surf
+
+    # save a preview to the cache folder (written to a temporary file of this process first, so a half written file
+    # is never read and games saving the same preview at once don't write to the same file)
+    def save(self, surf, path):
+        temp = path + "." + str(os.getpid()) + ".tmp.png"
+        try:
+            os.makedirs(self.folder, exist_ok=True)
+            pygame.image.save(surf, temp)
+            os.replace(temp, path)
+        except (OSError, pygame.error):
+            pass  # the preview is still shown, it is just rendered again next time
+        finally:
+            if os.path.exists(temp):
+                try:
+                    os.remove(temp)
+                except OSError:
+                    pass
+
+    # make the previews of a list of puzzle indexes that aren't made yet, in order, until the time budget is used
+    # returns list of the indexes made
+    def update(self, wanted, budget=FRAME_BUDGET):
+        made = []
+        start = time.perf_counter()
+        for ind in wanted:
+            if ind in self.previews:
+                continue
+            if made and time.perf_counter() - start > budget:
+                break
+            self.make(ind)
+            made.append(ind)
+        return made
+
+    # return if any puzzle of a list of indexes doesn't have its preview yet
+    def has_pending(self, wanted):
+        return any(ind not in self.previews for ind in wanted)
+
+
+# previews drawn beside the rows of a scroll menu
+class PreviewColumn:
+    def __init__(self, menu, cache, gap=10, color=GREY):
+        self.menu = menu
+        self.cache = cache
+        self.gap = gap  # space between a preview and its row
+        self.color = color  # outline drawn while a preview isn't made yet
+        self.offset = menu.offset  # menu offset when the previews were last drawn
+
+    # return rect of the preview of a row
+    def get_rect(self, row):
+        size = self.cache.size
+        x, y = self.menu.points[row]
+        return x - self.gap * 2 - size, y + (self.menu.cHeight - size) / 2, size, size
+
+    # return range of the items in view
+    def get_visible(self):
+        return range(self.menu.offset, min(self.menu.offset + self.menu.r, self.menu.item_count))
+
+    # return list of the items to make previews for, the rows in view first and then the pages above and below
+    def get_wanted(self):
+        visible = self.get_visible()
+        r = self.menu.r
+        below = range(visible.stop, min(visible.stop + r, self.menu.item_count))
+        above = range(max(0, visible.start - r), visible.start)
+        return list(visible) + list(below) + list(reversed(above))
+
+    # make some previews (called every frame), returns if there are previews left to make
+    def update(self, budget=FRAME_BUDGET):
+        if self.menu.offset != self.offset:  # scrolled, every row shows another item
+            self.offset = self.menu.offset
+            for row in range(len(self.get_visible())):
+                dirty.mark(self.get_rect(row))
+        wanted = self.get_wanted()
+        visible = self.get_visible()
+        for ind in self.cache.update(wanted, budget):
+            if ind in visible:
+                dirty.mark(self.get_rect(ind - visible.start))
+        return self.cache.has_pending(wanted)
+
+    def draw(self, win):
+        if not self.menu.visible:
+            return
+        for row, ind in enumerate(self.get_visible()):
+            rect = self.get_rect(row)
+            surf = self.cache.get(ind)
+            if surf is not None:
+                win.blit(surf, rect[:2])
+            else:
+                pygame.draw.rect(win, self.color, rect, 1)
@@ -0,0 +1,208 @@
+# --------------------------------------------------------------------
+# Program: Frame Profiler
+# Author: Alex Hyde
+# Date: Dec 04 2019
+# Description: Opt-in instrumentation of the drawing, hit-testing and
+#   text rendering code. Timed functions (the timed decorator) and
+#   counters are recorded per frame into a ring buffer of the last
+#   frames, which can be shown on screen by the overlay and dumped to a
+#   CSV or JSON file. While profiling is off, a timed function only
+#   checks a flag before running.
+# Input: enable() to start recording, end_frame() once per frame of
+#   the main loop.
+# --------------------------------------------------------------------
+
+import csv
+import functools
+import json
+import time
+from collections import deque
+
+import pygame
+import dirty
+
+RING_SIZE = 600  # frames kept in the ring buffer (10 seconds at 60 fps)
+SUMMARY_FRAMES = 60  # frames averaged by the overlay
+
+_enabled = False
+_current = {}  # name -> [calls, seconds] recorded in the frame so far
+_frames = deque(maxlen=RING_SIZE)  # (frame number, time the frame ended, {name: (calls, seconds)})
+_frame_number = 0
+
+
+# start (or stop) recording
+def enable(b=True):
+    global _enabled
+    _enabled = b
+    if not b:
+        _current.clear()
+
+
+def is_enabled():
+    return _enabled
+
+
+# return a decorator that records the calls and wall time of a function under a name (while recording)
+# times are inclusive, a timed function calling another timed function includes its time
+def timed(name):
+    def decorate(func):
+        @functools.wraps(func)
+        def wrapper(*args, **kwargs):
+            if not _enabled:
+                return func(*args, **kwargs)
+            start = time.perf_counter()
+            try:
+                return func(*args, **kwargs)
+            finally:
+                record(name, time.perf_counter() - start)
+        return wrapper
+    return decorate
+
+
+# add a call and its time to the current frame
+def record(name, seconds):
+    stats = _current.get(name)
+    if stats is None:
+        _current[name] = [1, seconds]
+    else:
+        stats[0] += 1
+        stats[1] += seconds
+
+
+# add to a counter of the current frame (e.g. label renders)
+def count(name, n=1):
+    if _enabled:
+        stats = _current.get(name)
+        if stats is None:
+            _current[name] = [n, 0.0]
+        else:
+            stats[0] += n
+
+
+# move the current frame's records into the ring buffer (called once per frame)
+def end_frame():
+    global _frame_number
+    if _enabled:
+        _frames.append((_frame_number, time.time(), {name: tuple(stats) for name, stats in _current.items()}))
+        _current.clear()
+    _frame_number += 1
+
+
+# return list of the frames in the ring buffer, oldest first
+def get_frames():
+    return list(_frames)
+
+
+# empty the ring buffer
+def clear():
+    _frames.clear()
+    _current.clear()
+
+
+# return dictionary of name -> (calls per frame, milliseconds per frame) over the last frames
+def summary(frames=SUMMARY_FRAMES):
+    recent = list(_frames)[-frames:]
+    totals = {}
+    for number, end, records in recent:
+        for name, (calls, seconds) in records.items():
+            t = totals.setdefault(name, [0, 0.0])
+            t[0] += calls
+            t[1] += seconds
+    n = max(len(recent), 1)
+    return {name: (calls / n, seconds * 1000 / n) for name, (calls, seconds) in totals.items()}
+
+
+# write the ring buffer to a file, as JSON if the path ends in .json, otherwise as CSV (one row per name per frame)
+def dump(path):
+    frames = get_frames()
+    with open(path, "w", newline="") as f:
+        if path.endswith(".json"):
+            json.dump([{"frame": number, "time": end,
+                        "records": {name: {"calls": calls, "ms": seconds * 1000}
+                                    for name, (calls, seconds) in records.items()}}
+                       for number, end, records in frames], f)
+        else:
+            writer = csv.writer(f)
+            writer.writerow(["frame", "time", "name", "calls", "ms"])
+            for number, end, records in frames:
+                for name, (calls, seconds) in records.items():
+                    writer.writerow([number, "%.3f" % end, name, calls, "%.4f" % (seconds * 1000)])
+
+
+# dumps the ring buffer to a file every so often
+class Dumper:
+    def __init__(self, path, interval=10.0):
+        self.path = path
+        self.interval = interval  # seconds between dumps
+        self.last = time.perf_counter()
+
+    # dump if the interval has passed since the last dump, returns if a dump was written
+    def update(self):
+        now = time.perf_counter()
+        if now - self.last < self.interval:
+            return False
+        self.last = now
+        dump(self.path)
+        return True
+
+
+# text overlay showing the per frame averages of the last frames
+class Overlay:
+    def __init__(self, x=5, y=5, font="lucida bright", size=14, color=(0, 0, 0), bColor=(255, 255, 220)):
+        self.x = x
+        self.y = y
+        self.font = font
+        self.size = size
+        self.color = color
+        self.bColor = bColor
+        self.visible = False
+        self.was_enabled = False  # if profiling was on before the overlay was shown
+        self.rect = None  # area covered when it was last drawn
+
+    # show or hide the overlay (profiling is on while it is shown, and back to how it was when it is hidden)
+    def toggle(self):
+        self.visible = not self.visible
+        if self.visible:
+            self.was_enabled = _enabled
+            enable(True)
+        else:
+            enable(self.was_enabled)
+            if self.rect is not None:
+                dirty.mark(self.rect)  # redraw what was under it
+
+    # return lines of text shown by the overlay
+    def get_lines(self):
+        lines = ["per frame (last %d frames)" % min(len(_frames), SUMMARY_FRAMES)]
+        for name, (calls, ms) in sorted(summary().items()):
+            if ms > 0:
+                lines.append("%s  %.3f ms  x%.1f" % (name, ms, calls))
+            else:
+                lines.append("%s  x%.1f" % (name, calls))
+        return lines
+
+    # draw the overlay on top of a drawn frame, returns the area to update on the display (None if hidden)
+    def draw(self, win):
+        if not self.visible:
+            return None
+        import fonts
+
+        global _enabled
+        was_enabled = _enabled
+        _enabled = False  # the overlay's own text isn't counted
+        try:
+            # rendered directly, its lines change every frame and would push labels out of the rendered text cache
+            font = fonts.get_font(self.font, self.size)
+            rendered = [font.render(line, True, self.color) for line in self.get_lines()]
+        finally:
+            _enabled = was_enabled
+        rect = pygame.Rect(self.x, self.y, max(r.get_width() for r in rendered) + 6,
+                           sum(r.get_height() for r in rendered) + 6)
+        win.fill(self.bColor, rect)
+        y = self.y + 3
+        for r in rendered:
+            win.blit(r, (self.x + 3, y))
+            y += r.get_height()
+        update = rect if self.rect is None else rect.union(self.rect)
+        self.rect = rect
+        dirty.mark(rect)  # the frame under the overlay is redrawn next frame, before the overlay is drawn again
+        return update
@@ -0,0 +1,57 @@
+# --------------------------------------------------------------------
+# Program: Puzzle Class
+# Author: Alex Hyde
+# Date: Nov 06 2019
+# Description: Puzzle class for storing a word search puzzle and the
+#   reader and writer for the puzzle text file. Kept free of pygame so
+#   puzzles can be loaded by tools that do not open a window.
+# --------------------------------------------------------------------
+
+
+# puzzle class for storing puzzle info (used as argument in word search class)
+class Puzzle:
+    def __init__(self, title, ltrs, wrds, c, r):
+        self.title = title
+        self.words = wrds
+        self.letters = ltrs
+        self.c = c
+        self.r = r
+
+    def get_title(self):
+        return self.title
+
+
+# create a list of puzzle objects storing the puzzles read in from the puzzle file
+def read_in_puzzles(file):
+    pz = []
+    for i in range(int(file.readline().strip())):
+        title = file.readline().strip()
+        rows = int(file.readline().strip())
+        cols = int(file.readline().strip())
+        ltrs = ""
+        for r in range(rows):
+            ltrs += file.readline().strip() + " "
+        ltrs = ltrs.split()
+        wordnum = int(file.readline().strip())
+        wrds = []
+        for w in range(wordnum):
+            wrds.append(file.readline().strip())
+        pz.append(Puzzle(title, ltrs, wrds, cols, rows))
+    return pz
+
+
+# return the puzzle written in the puzzle file format (without the puzzle count)
+def format_puzzle(p):
+    lines = [p.get_title(), str(p.r), str(p.c)]
+    for y in range(p.r):
+        lines.append(" ".join(p.letters[y * p.c:(y + 1) * p.c]))
+    lines.append(str(len(p.words)))
+    lines += p.words
+    return "\n".join(lines) + "\n"
+
+
+# write a list of puzzles to a puzzle file
+def write_puzzles(puzzles, file):
+    file.write(str(len(puzzles)) + "\n")
+    for p in puzzles:
+        file.write(format_puzzle(p))
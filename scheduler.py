@@ -0,0 +1,92 @@
+# --------------------------------------------------------------------
+# Program: Frame Scheduler
+# Author: Alex Hyde
+# Date: Nov 29 2019
+# Description: Decides how the main loop waits for its next frame.
+#   While something is moving (a drag or an animation) frames run at a
+#   fixed rate, otherwise the loop sleeps in pygame.event.wait until an
+#   event arrives (or a timeout passes). Keeps count of the time spent
+#   in each mode.
+# Input: The main loop calls get_events() once per frame and
+#   set_active() when a drag starts or ends.
+# --------------------------------------------------------------------
+
+import time
+import pygame
+
+FPS = 60  # frame rate while active
+IDLE_TIMEOUT = 1000  # longest time (ms) to sleep while idle before running a frame anyway
+
+
+# chooses between a fixed rate loop and waiting for events
+class Scheduler:
+    def __init__(self, fps=FPS, idle_timeout=IDLE_TIMEOUT):
+        self.fps = fps
+        self.idle_timeout = idle_timeout
+        self.clock = pygame.time.Clock()
+        self.active = False  # if frames are run at the fixed rate
+        self.animations = 0  # number of running animations keeping the loop active
+        self.active_time = 0.0  # seconds spent in each mode
+        self.idle_time = 0.0
+        self.active_frames = 0
+        self.idle_frames = 0  # frames run after waking up from an idle wait
+        self.timeouts = 0  # idle waits that ended without an event
+        self.last = time.perf_counter()
+
+    # run frames at the fixed rate (True) or wait for events (False)
+    def set_active(self, b):
+        self.active = b
+
+    # keep the loop active while an animation runs (every start must be followed by a stop)
+    def start_animation(self):
+        self.animations += 1
+
+    def stop_animation(self):
+        self.animations = max(self.animations - 1, 0)
+
+    # return if frames are being run at the fixed rate
+    def is_active(self):
+        return self.active or self.animations > 0
+
+    # add the time since the last call to the mode's total
+    def account(self, active):
+        now = time.perf_counter()
+        if active:
+            self.active_time += now - self.last
+        else:
+            self.idle_time += now - self.last
+        self.last = now
+
+    # wait for the next frame and return the events that arrived, sleeping until an event arrives while idle
+    def get_events(self):
+        active = self.is_active()
+        self.account(active)
+        if active:
+            self.clock.tick(self.fps)
+            events = pygame.event.get()
+            self.active_frames += 1
+        else:
+            event = pygame.event.wait(self.idle_timeout)
+            if event.type == pygame.NOEVENT:
+                self.timeouts += 1
+                events = []
+            else:
+                events = [event] + pygame.event.get()  # everything else that is already queued
+            self.clock.tick()  # the idle time doesn't count against the first active frame
+            self.idle_frames += 1
+        self.account(active)
+        return events
+
+    # return dictionary of time and frames spent in each mode
+    def get_stats(self):
+        total = self.active_time + self.idle_time
+        return {"active_time": self.active_time, "idle_time": self.idle_time,
+                "idle_fraction": self.idle_time / total if total > 0 else 0.0,
+                "active_frames": self.active_frames, "idle_frames": self.idle_frames, "timeouts": self.timeouts}
+
+    # return a one line summary of the stats
+    def report(self):
+        stats = self.get_stats()
+        return ("idle %.1f s (%.0f%%), active %.1f s, %d active frames, %d idle frames"
+                % (stats["idle_time"], stats["idle_fraction"] * 100, stats["active_time"],
+                   stats["active_frames"], stats["idle_frames"]))
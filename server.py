@@ -0,0 +1,253 @@
+# --------------------------------------------------------------------
+# Program: Word Search Server
+# Author: Alex Hyde
+# Date: Dec 01 2019
+# Description: Asyncio server hosting word search games for thin
+#   clients. Each connection can run any number of game sessions
+#   (engine.GameState). Puzzles and their line tables are loaded once
+#   and shared, read only, by every session playing them, so a session
+#   only keeps the words and cells it has found.
+#
+#   Protocol: one JSON object per line in each direction. Requests
+#   have an "op" and an optional "id" that is copied into the reply.
+#     {"op": "list", "start": 0, "count": 50}  puzzle titles
+#     {"op": "start", "puzzle": 3}             new session, replies
+#                                              with its "session" and
+#                                              the puzzle
+#     {"op": "select", "session": 1, "start": [x, y], "end": [x, y]}
+#                                              select cells (cell
+#                                              positions or indices)
+#     {"op": "state", "session": 1}            words found and left
+#     {"op": "end", "session": 1}              close a session
+#   Replies have "ok": true, or "ok": false and an "error".
+# Input: python server.py puzzles.txt [--host HOST] [--port PORT]
+#   [--unix PATH]
+# --------------------------------------------------------------------
+
+import asyncio
+import json
+import sys
+import traceback
+
+import engine
+import library
+import linetable
+
+DEFAULT_HOST = "127.0.0.1"
+DEFAULT_PORT = 8765
+MAX_LINE = 64 * 1024  # longest request line accepted (bytes)
+MAX_LIST = 500  # most titles returned by one list request
+
+
+# error sent back to a client (the connection stays open)
+class RequestError(Exception):
+    pass
+
+
+# puzzles of a library with their line tables, loaded the first time they are played and shared by every session
+class PuzzleStore:
+    def __init__(self, puzzles):
+        self.puzzles = puzzles  # puzzle library (library.open_library) or list of puzzles
+        self.loaded = {}  # puzzle index -> (puzzle, line table)
+
+    def __len__(self):
+        return len(self.puzzles)
+
+    def get_title(self, ind):
+        if hasattr(self.puzzles, "get_title"):
+            return self.puzzles.get_title(ind)
+        return self.puzzles[ind].get_title()
+
+    # return the puzzle and line table for a puzzle index
+    def get(self, ind):
+        entry = self.loaded.get(ind)
+        if entry is None:
+            p = self.puzzles[ind]
+            entry = (p, linetable.build(p))
+            self.loaded[ind] = entry
+        return entry
+
+
+# hosts game sessions for every connected client
+class GameServer:
+    def __init__(self, puzzles):
+        self.store = PuzzleStore(puzzles)
+        self.sessions = {}  # session id -> game state
+        self.next_session = 1
+        self.connections = 0
+        self.requests = 0
+        self.server = None
+
+    # start listening on a TCP port (port 0 picks a free port), returns the asyncio server
+    async def start(self, host=DEFAULT_HOST, port=DEFAULT_PORT):
+        self.server = await asyncio.start_server(self.handle_client, host, port, limit=MAX_LINE)
+        return self.server
+
+    # start listening on a Unix socket, returns the asyncio server
+    async def start_unix(self, path):
+        self.server = await asyncio.start_unix_server(self.handle_client, path, limit=MAX_LINE)
+        return self.server
+
+    # return (host, port) the server is listening on (the path for a Unix socket)
+    def get_address(self):
+        return self.server.sockets[0].getsockname()
+
+    async def close(self):
+        if self.server is not None:
+            self.server.close()
+            await self.server.wait_closed()
+
+    # serve one client until it disconnects, its sessions are closed with the connection
+    async def handle_client(self, reader, writer):
+        self.connections += 1
+        owned = set()  # sessions started by this connection
+        try:
+            while True:
+                try:
+                    line = await reader.readline()
+                except (ValueError, asyncio.LimitOverrunError):  # line longer than MAX_LINE
+                    writer.write(encode_reply({"ok": False, "error": "request too long"}))
+                    break
+                if not line:
+                    break
+                if not line.strip():
+                    continue
+                writer.write(encode_reply(self.handle_line(line, owned)))
+                await writer.drain()
+        except ConnectionError:
+            pass
+        finally:
+            for session in owned:
+                self.sessions.pop(session, None)
+            self.connections -= 1
+            writer.close()
+
+    # return the reply to one request line
+    def handle_line(self, line, owned):
+        self.requests += 1
+        request_id = None
+        try:
+            try:
+                request = json.loads(line)
+            except ValueError:
+                raise RequestError("request is not valid JSON")
+            if not isinstance(request, dict):
+                raise RequestError("request must be a JSON object")
+            request_id = request.get("id")
+            reply = self.handle_request(request, owned)
+            reply["ok"] = True
+        except RequestError as e:
+            reply = {"ok": False, "error": str(e)}
+        except Exception as e:  # e.g. a puzzle that can't be read from the library, the connection stays open
+            traceback.print_exc()
+            reply = {"ok": False, "error": "internal error: " + type(e).__name__}
+        if request_id is not None:
+            reply["id"] = request_id
+        return reply
+
+    # return the reply to a request (raises RequestError for bad requests)
+    def handle_request(self, request, owned):
+        op = request.get("op")
+        if op == "list":
+            start = get_int(request, "start", 0)
+            count = min(get_int(request, "count", MAX_LIST), MAX_LIST)
+            end = min(max(start, 0) + max(count, 0), len(self.store))
+            return {"count": len(self.store), "start": start,
+                    "titles": [self.store.get_title(i) for i in range(max(start, 0), end)]}
+
+        if op == "start":
+            ind = get_int(request, "puzzle")
+            if not 0 <= ind < len(self.store):
+                raise RequestError("no puzzle " + str(ind))
+            p, lines = self.store.get(ind)
+            session = self.next_session
+            self.next_session += 1
+            self.sessions[session] = engine.GameState(p, lines)
+            owned.add(session)
+            return {"session": session, "puzzle": ind, "title": p.get_title(), "rows": p.r, "cols": p.c,
+                    "letters": "".join(p.letters), "words": p.words}
+
+        if op not in ("select", "state", "end"):
+            raise RequestError("unknown op " + repr(op))
+        game = self.get_session(request, owned)
+        if op == "select":
+            result = game.select(get_cell(game, request, "start"), get_cell(game, request, "end"))
+            return {"word": result.word, "new": result.new, "complete": result.complete,
+                    "cells": len(result.cells), "found": game.found_words}
+        if op == "state":
+            return {"found": game.found_order, "remaining": game.get_remaining(), "complete": game.is_complete()}
+        if op == "end":
+            del self.sessions[request["session"]]
+            owned.discard(request["session"])
+            return {}
+
+    # return the game of the request's session (only the connection that started a session can use it)
+    def get_session(self, request, owned):
+        session = request.get("session")
+        if type(session) != int or session not in owned or session not in self.sessions:
+            raise RequestError("no session " + repr(session))
+        return self.sessions[session]
+
+
+# return an integer field of a request
+def get_int(request, key, default=None):
+    value = request.get(key, default)
+    if type(value) != int:
+        raise RequestError("'" + key + "' must be an integer")
+    return value
+
+
+# return the cell index of a cell field of a request, given as an index or as [column, row]
+def get_cell(game, request, key):
+    value = request.get(key)
+    if type(value) == int:
+        ind = value
+    elif isinstance(value, list) and len(value) == 2 and all(type(v) == int for v in value):
+        if not (0 <= value[0] < game.c and 0 <= value[1] < game.r):
+            raise RequestError("'" + key + "' is outside of the puzzle")
+        ind = game.get_cell(value[0], value[1])
+    else:
+        raise RequestError("'" + key + "' must be a cell index or [column, row]")
+    if not 0 <= ind < game.r * game.c:
+        raise RequestError("'" + key + "' is outside of the puzzle")
+    return ind
+
+
+# return a reply as a line of bytes
+def encode_reply(reply):
+    return (json.dumps(reply, separators=(",", ":")) + "\n").encode("utf-8")
+
+
+# run a server until it is stopped (Ctrl+C)
+async def serve(path, host=DEFAULT_HOST, port=DEFAULT_PORT, unix_path=None):
+    with library.open_library(path) as puzzles:
+        game_server = GameServer(puzzles)
+        if unix_path is not None:
+            server = await game_server.start_unix(unix_path)
+        else:
+            server = await game_server.start(host, port)
+        print("Serving " + str(len(puzzles)) + " puzzles on " + str(game_server.get_address()))
+        async with server:
+            await server.serve_forever()
+
+
+if __name__ == "__main__":
+    args = sys.argv[1:]
+    options = {"--host": DEFAULT_HOST, "--port": str(DEFAULT_PORT), "--unix": None}
+    paths = []
+    i = 0
+    while i < len(args):
+        if args[i] in options and i + 1 < len(args):
+            options[args[i]] = args[i + 1]
+            i += 1
+        else:
+            paths.append(args[i])
+        i += 1
+    if len(paths) != 1 or not options["--port"].isdigit():
+        print("usage: python server.py puzzles.txt [--host HOST] [--port PORT] [--unix PATH]")
+        sys.exit(2)
+
+    try:
+        asyncio.run(serve(paths[0], options["--host"], int(options["--port"]), options["--unix"]))
+    except KeyboardInterrupt:
+        pass
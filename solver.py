@@ -0,0 +1,204 @@
+# --------------------------------------------------------------------
+# Program: Word Search Solver
+# Author: Alex Hyde
+# Date: Nov 20 2019
+# Description: Headless solver that finds where every word of a puzzle
+#   is placed. The word list is built into an Aho-Corasick automaton
+#   (a trie with failure links), so one pass over every line of the
+#   grid finds all of the words in all 8 directions.
+#   A NumPy backend (solver_numpy) can be selected for large grids.
+# Input: Puzzle objects (letters, r, c and words), or a puzzle file
+#   when run on its own.
+# --------------------------------------------------------------------
+
+import sys
+from collections import deque
+
+# direction constants (dx, dy) in grid cells, y increasing downwards
+RIGHT = (1, 0)
+DOWN_RIGHT = (1, 1)
+DOWN = (0, 1)
+DOWN_LEFT = (-1, 1)
+LEFT = (-1, 0)
+UP_LEFT = (-1, -1)
+UP = (0, -1)
+UP_RIGHT = (1, -1)
+DIRECTIONS = (RIGHT, DOWN_RIGHT, DOWN, DOWN_LEFT, LEFT, UP_LEFT, UP, UP_RIGHT)
+
+# solver backends that can be passed to find_words
+PYTHON = "python"
+NUMPY = "numpy"
+BACKENDS = (PYTHON, NUMPY)
+
+
+# a word found in a puzzle, from its first letter to its last letter
+class Placement:
+    def __init__(self, word, start, end, direction):
+        self.word = word
+        self.start = start  # (column, row) of the first letter
+        self.end = end  # (column, row) of the last letter
+        self.direction = direction  # (dx, dy) from the first letter to the last
+
+    # return list of (column, row) cells covered by the word, first letter first
+    def cells(self):
+        dx, dy = self.direction
+        return [(self.start[0] + dx * i, self.start[1] + dy * i) for i in range(len(self.word))]
+
+    def __eq__(self, other):
+        return isinstance(other, Placement) and (self.word, self.start, self.end) == (other.word, other.start,
+                                                                                      other.end)
+
+    def __hash__(self):
+        return hash((self.word, self.start, self.end))
+
+    def __repr__(self):
+        return "Placement(%r, %r, %r, %r)" % (self.word, self.start, self.end, self.direction)
+
+
+# Aho-Corasick automaton over a set of patterns, each with a value returned when the pattern is matched
+class Automaton:
+    def __init__(self):
+        self.goto = [{}]  # state -> {character: next state}
+        self.fail = [0]  # state -> longest proper suffix state
+        self.out = [[]]  # state -> (pattern length, value) of every pattern ending in the state
+        self.built = True
+
+    def add(self, pattern, value):
+        state = 0
+        for ch in pattern:
+            nxt = self.goto[state].get(ch)
+            if nxt is None:
+                nxt = len(self.goto)
+                self.goto[state][ch] = nxt
+                self.goto.append({})
+                self.fail.append(0)
+                self.out.append([])
+            state = nxt
+        self.out[state].append((len(pattern), value))
+        self.built = False
+
+    # compute failure links (breadth first), merging the outputs of each state's suffix states
+    def build(self):
+        queue = deque(self.goto[0].values())
+        for s in queue:
+            self.fail[s] = 0
+        while queue:
+            state = queue.popleft()
+            for ch, nxt in self.goto[state].items():
+                f = self.fail[state]
+                while f and ch not in self.goto[f]:
+                    f = self.fail[f]
+                self.fail[nxt] = self.goto[f].get(ch, 0)
+                self.out[nxt] = self.out[nxt] + self.out[self.fail[nxt]]
+                queue.append(nxt)
+        self.built = True
+
+    # yield (index of the last character, pattern length, value) of every pattern match in a sequence
+    def search(self, seq):
+        if not self.built:
+            self.build()
+        goto = self.goto
+        fail = self.fail
+        out = self.out
+        state = 0
+        for i, ch in enumerate(seq):
+            while state and ch not in goto[state]:
+                state = fail[state]
+            state = goto[state].get(ch, 0)
+            for length, value in out[state]:
+                yield i, length, value
+
+
+# return automaton matching every word forwards and backwards
+# values are (word, reversed) so a match can be turned back into a placement
+def build_automaton(words):
+    automaton = Automaton()
+    for w in set(words):
+        if w:
+            automaton.add(w, (w, False))
+            if len(w) > 1:
+                automaton.add(w[::-1], (w, True))
+    automaton.build()
+    return automaton
+
+
+# return every line of the grid as a list of (column, row) cells, together with the direction of the line
+# only 4 directions are needed, the other 4 are found by matching backwards words
+def grid_lines(r, c):
+    lines = []
+    for y in range(r):  # rows
+        lines.append(([(x, y) for x in range(c)], RIGHT))
+    for x in range(c):  # columns
+        lines.append(([(x, y) for y in range(r)], DOWN))
+    for start in range(-(r - 1), c):  # top left to bottom right diagonals, x - y = start
+        lines.append(([(y + start, y) for y in range(r) if 0 <= y + start < c], DOWN_RIGHT))
+    for start in range(r + c - 1):  # bottom left to top right diagonals, x + y = start
+        lines.append(([(start - y, y) for y in range(r - 1, -1, -1) if 0 <= start - y < c], UP_RIGHT))
+    return lines
+
+
+# return dictionary of word -> list of every placement of the word in the puzzle (empty if it is not in the puzzle)
+# backend is PYTHON (automaton, no dependencies) or NUMPY (vectorized, faster on large grids)
+def find_words(puzzle, automaton=None, backend=PYTHON):
+    if backend == NUMPY:
+        import solver_numpy  # numpy is only needed when its backend is used
+        return solver_numpy.find_words(puzzle)
+    if backend != PYTHON:
+        raise ValueError("Unknown solver backend: " + str(backend))
+    if automaton is None:
+        automaton = build_automaton(puzzle.words)
+    letters = puzzle.letters
+    c = puzzle.c
+    found = {w: [] for w in puzzle.words}
+    seen = set()
+    for cells, (dx, dy) in grid_lines(puzzle.r, c):
+        text = [letters[y * c + x] for x, y in cells]
+        for i, length, (word, backwards) in automaton.search(text):
+            first = cells[i - length + 1]
+            last = cells[i]
+            if backwards:
+                p = Placement(word, last, first, (-dx, -dy))
+            else:
+                p = Placement(word, first, last, (dx, dy))
+            if p not in seen:  # single letter words are found in every direction
+                seen.add(p)
+                found[word].append(p)
+    return found
+
+
+# return dictionary of word -> first placement of the word (None if it is not in the puzzle)
+def solve(puzzle, backend=PYTHON):
+    return {w: (p[0] if p else None) for w, p in find_words(puzzle, backend=backend).items()}
+
+
+# return list of the puzzle's words that can't be found in its grid
+def missing_words(puzzle, backend=PYTHON):
+    return [w for w, p in find_words(puzzle, backend=backend).items() if not p]
+
+
+# return list of (puzzle, missing words) for every puzzle that has words that can't be found
+def verify(puzzles, backend=PYTHON):
+    bad = []
+    for p in puzzles:
+        missing = missing_words(p, backend)
+        if missing:
+            bad.append((p, missing))
+    return bad
+
+
+if __name__ == "__main__":
+    import puzzle
+
+    args = sys.argv[1:]
+    backend = PYTHON
+    if "--numpy" in args:
+        args.remove("--numpy")
+        backend = NUMPY
+    path = args[0] if args else "puzzles.txt"
+    with open(path, "r") as f:
+        puzzles = puzzle.read_in_puzzles(f)
+    problems = verify(puzzles, backend)
+    for p, missing in problems:
+        print(p.get_title() + ": missing " + ", ".join(missing))
+    print(str(len(puzzles) - len(problems)) + "/" + str(len(puzzles)) + " puzzles solvable")
+    sys.exit(1 if problems else 0)
@@ -0,0 +1,108 @@
+# --------------------------------------------------------------------
+# Program: NumPy Word Search Solver
+# Author: Alex Hyde
+# Date: Nov 21 2019
+# Description: Solver backend for large grids. The grid is stored as
+#   a uint8 array and each of the 8 directions is a strided view of
+#   the (zero padded) grid, so a word is checked at every possible
+#   start cell with one vectorized comparison. Used through
+#   solver.find_words(puzzle, backend="numpy").
+# --------------------------------------------------------------------
+
+import numpy as np
+from numpy.lib.stride_tricks import as_strided
+
+import solver
+
+
+# return the puzzle's letters as an r x c uint8 array (one byte per cell)
+def grid_array(puzzle):
+    text = "".join(puzzle.letters)
+    if len(text) != puzzle.r * puzzle.c:
+        raise ValueError("Every cell of the puzzle must be a single letter")
+    return np.frombuffer(text.encode("latin-1"), dtype=np.uint8).reshape(puzzle.r, puzzle.c)
+
+
+# return an (r, c, length) view where view[y, x] is the line of letters starting at (x, y) in direction (dx, dy)
+# letters outside of the grid read as 0 (from the padding), so they never match a word
+def line_view(padded, pad, r, c, direction, length):
+    dx, dy = direction
+    s0, s1 = padded.strides
+    origin = padded[pad:, pad:]
+    return as_strided(origin, shape=(r, c, length), strides=(s0, s1, dy * s0 + dx * s1), writeable=False)
+
+
+# multiplier of the polynomial line hash (arithmetic wraps around at 2 ** 64 in both numpy and hash_word)
+HASH_BASE = 1000003
+HASH_MASK = 2 ** 64 - 1
+FILTER_BITS = 20  # size (in bits of the hash) of the table used to skip cells that can't be the start of a word
+FILTER_MIX = 0x9E3779B97F4A7C15  # spreads every bit of a hash into its top bits (Fibonacci hashing)
+
+
+# return the hash of a word, the same value line_hashes computes for a line spelling the word
+def hash_word(word):
+    h = 0
+    for ch in word.encode("latin-1"):
+        h = (h * HASH_BASE + ch) & HASH_MASK
+    return h
+
+
+# return dictionary of word -> list of every placement of the word in the puzzle (same result as solver.find_words)
+# every word (and every backwards word) of a length is matched at once: the hash of the line starting at each cell
+# is computed for the whole grid, looked up in the sorted word hashes, and the few hits are checked letter by letter
+def find_words(puzzle):
+    r, c = puzzle.r, puzzle.c
+    found = {w: [] for w in puzzle.words}
+    words = [w for w in found if w]
+    if not words or r == 0 or c == 0:
+        return found
+    grid = grid_array(puzzle)
+    longest = max(len(w) for w in words)
+    pad = longest - 1
+    padded = np.zeros((r + 2 * pad, c + 2 * pad), dtype=np.uint8)
+    padded[pad:pad + r, pad:pad + c] = grid
+
+    # length -> (sorted word hashes, hash -> list of (word, backwards))
+    tables = {}
+    for w in words:
+        entries = [(w, False)]
+        if len(w) > 1:
+            entries.append((w, True))
+        for word, backwards in entries:
+            h = hash_word(word[::-1] if backwards else word)
+            tables.setdefault(len(w), {}).setdefault(h, []).append((word, backwards))
+    shift = np.uint64(64 - FILTER_BITS)
+    mix = np.uint64(FILTER_MIX)
+    for length, t in tables.items():
+        hashes = np.array(sorted(t), dtype=np.uint64)
+        possible = np.zeros(1 << FILTER_BITS, dtype=bool)  # top bits of every mixed word hash of this length
+        possible[(hashes * mix) >> shift] = True
+        tables[length] = possible, t
+
+    base = np.uint64(HASH_BASE)
+    # only 4 directions are scanned, the other 4 are found through the backwards words
+    for n, (dx, dy) in enumerate((solver.RIGHT, solver.DOWN, solver.DOWN_RIGHT, solver.UP_RIGHT)):
+        lines = line_view(padded, pad, r, c, (dx, dy), longest)
+        h = np.zeros((r, c), dtype=np.uint64)
+        for length in range(1, longest + 1):
+            h *= base
+            h += lines[:, :, length - 1]
+            if length not in tables or (length == 1 and n > 0):  # single letters only need to be found once
+                continue
+            possible, table = tables[length]
+            keys = h.ravel()
+            cells = np.flatnonzero(possible[(keys * mix) >> shift])
+            for i in cells:
+                key = int(keys[i])
+                if key not in table:
+                    continue
+                y, x = divmod(int(i), c)
+                text = lines[y, x, :length].tobytes().decode("latin-1")
+                for word, backwards in table[key]:
+                    if backwards and text == word[::-1]:
+                        end = (x + dx * (length - 1), y + dy * (length - 1))
+                        found[word].append(solver.Placement(word, end, (x, y), (-dx, -dy)))
+                    elif not backwards and text == word:
+                        end = (x + dx * (length - 1), y + dy * (length - 1))
+                        found[word].append(solver.Placement(word, (x, y), end, (dx, dy)))
+    return found